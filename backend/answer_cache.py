@@ -0,0 +1,118 @@
+# answer_cache.py - Cache of GENERAL (LLM) answers keyed by normalized question
+
+import json
+import logging
+import os
+import re
+import time
+from typing import Dict, Optional
+
+from cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+ANSWER_CACHE_CONFIG = {
+    "max_entries": int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "2000")),
+    "ttl": float(os.getenv("ANSWER_CACHE_TTL_SECONDS", str(24 * 3600))),
+    "max_bytes": int(os.getenv("ANSWER_CACHE_MAX_BYTES", str(8 * 1024 * 1024))),
+    # Token-set (Jaccard) similarity needed to reuse a near-duplicate question; 0 disables
+    "similarity": float(os.getenv("ANSWER_CACHE_SIMILARITY", "0")),
+    # JSON file to load on startup and save on shutdown; empty = memory only
+    "path": os.getenv("ANSWER_CACHE_PATH", ""),
+}
+
+# Dropped from keys. Question words and negations are kept on purpose:
+# "when was X established" and "where is X" need different answers.
+STOPWORDS = frozenset({
+    'a', 'an', 'the', 'is', 'are', 'was', 'were', 'be', 'of', 'in', 'on', 'at',
+    'to', 'for', 'me', 'my', 'i', 'you', 'your', 'please', 'tell', 'can',
+    'could', 'would', 'do', 'does', 'about', 'kindly', 'and',
+})
+
+_PUNCTUATION = re.compile(r"[^\w\s]")
+
+
+def normalize_question(question: str) -> str:
+    """Case-fold and drop punctuation/stopwords, e.g. "What's the ADDRESS of GUNI?" -> whats address guni"""
+    words = _PUNCTUATION.sub('', question.lower()).split()
+    return ' '.join(w for w in words if w not in STOPWORDS)
+
+
+class AnswerCache:
+    """LRU + TTL answer cache with optional near-duplicate matching and disk persistence"""
+
+    def __init__(self, max_entries: int, ttl: float, max_bytes: int, similarity: float = 0.0, path: str = ""):
+        self._cache = TTLCache(max_entries=max_entries, ttl=ttl, max_bytes=max_bytes)
+        self.similarity = similarity
+        self.path = path
+        self.similar_hits = 0
+
+    def get(self, question: str) -> Optional[str]:
+        key = normalize_question(question)
+        if not key:
+            return None
+
+        answer = self._cache.get(key)
+        if answer is not None or self.similarity <= 0:
+            return answer
+
+        match = self._most_similar(key)
+        if match is not None:
+            self.similar_hits += 1
+            # Counted as a hit (by the lookup below), not a miss
+            self._cache.misses -= 1
+            return self._cache.get(match)
+        return None
+
+    def set(self, question: str, answer: str):
+        key = normalize_question(question)
+        if key and answer:
+            self._cache.set(key, answer)
+
+    def _most_similar(self, key: str) -> Optional[str]:
+        tokens = set(key.split())
+        best_key, best_score = None, self.similarity
+        for cached_key, _, _ in self._cache.items():
+            cached_tokens = set(cached_key.split())
+            score = len(tokens & cached_tokens) / len(tokens | cached_tokens)
+            if score >= best_score:
+                best_key, best_score = cached_key, score
+        return best_key
+
+    def clear(self):
+        self._cache.clear()
+
+    def load(self):
+        """Load unexpired answers from self.path, if configured and present"""
+        if not self.path or not os.path.exists(self.path):
+            return
+        with open(self.path, encoding="utf-8") as f:
+            entries = json.load(f)
+        now = time.time()
+        for entry in entries:
+            remaining = entry["expires_at"] - now
+            if remaining > 0:
+                self._cache.set(entry["key"], entry["answer"], ttl=remaining)
+        logger.info("Loaded %d cached answers from %s", len(self._cache), self.path)
+
+    def save(self):
+        """Write live answers to self.path (atomically), if configured"""
+        if not self.path:
+            return
+        now = time.time()
+        entries = [
+            {"key": key, "answer": answer, "expires_at": now + remaining}
+            for key, answer, remaining in self._cache.items()
+        ]
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entries, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def stats(self) -> Dict[str, int]:
+        stats = self._cache.stats()
+        stats["similar_hits"] = self.similar_hits
+        return stats
+
+
+answer_cache = AnswerCache(**ANSWER_CACHE_CONFIG)
@@ -0,0 +1,60 @@
+# baseline.py - Pre-optimization code for the benchmarks, read from git history
+#
+# Benchmarks that compare against the code as it was before an optimization
+# load it with `git show <rev>:<path>` instead of keeping a second copy in
+# the tree. load_module() runs a whole self-contained module;
+# load_functions() takes only the named top-level functions of a module
+# that cannot be imported as a whole (e.g. main.py and its DB setup).
+# Needs a git checkout with history.
+
+import ast
+import os
+import subprocess
+import types
+from typing import Iterable, Sequence
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def git_source(rev: str, path: str) -> str:
+    """Contents of path (relative to the repository root) at rev"""
+    try:
+        return subprocess.run(
+            ["git", "show", f"{rev}:{path}"], cwd=REPO_ROOT,
+            check=True, capture_output=True, text=True, encoding="utf-8",
+        ).stdout
+    except (OSError, subprocess.CalledProcessError) as e:
+        detail = (getattr(e, "stderr", None) or str(e)).strip()
+        raise RuntimeError(f"Cannot read the baseline {rev}:{path} from git: {detail}") from e
+
+
+def _module(name: str, rev: str, path: str, code) -> types.ModuleType:
+    module = types.ModuleType(name)
+    module.__file__ = f"{rev}:{path}"
+    exec(compile(code, module.__file__, "exec"), module.__dict__)
+    return module
+
+
+def load_module(name: str, rev: str, path: str) -> types.ModuleType:
+    """Execute path at rev as a throwaway module (not added to sys.modules)"""
+    return _module(name, rev, path, git_source(rev, path))
+
+
+def load_functions(name: str, rev: str, path: str, functions: Iterable[str],
+                   imports: Sequence[str] = ("typing",)) -> types.ModuleType:
+    """
+    A throwaway module holding only the named top-level functions of path at
+    rev, plus its top-level imports from the given (dependency-free) modules.
+    """
+    tree = ast.parse(git_source(rev, path))
+    wanted = set(functions)
+    body = [
+        node for node in tree.body
+        if (isinstance(node, ast.FunctionDef) and node.name in wanted)
+        or (isinstance(node, ast.ImportFrom) and node.module in imports)
+        or (isinstance(node, ast.Import) and all(alias.name in imports for alias in node.names))
+    ]
+    missing = wanted - {node.name for node in body if isinstance(node, ast.FunctionDef)}
+    if missing:
+        raise RuntimeError(f"{rev}:{path} has no top-level {', '.join(sorted(missing))}")
+    return _module(name, rev, path, ast.Module(body=body, type_ignores=[]))
@@ -0,0 +1,105 @@
+# bench_answer_cache.py - Replay GENERAL questions through the answer cache
+#
+# Usage (from backend/):
+#   python benchmarks/bench_answer_cache.py [--log questions.txt] [--requests 5000]
+#                                           [--llm-ms 800] [--similarity 0.6]
+#
+# Without --log, replays a synthetic Zipf-distributed mix of campus questions
+# with phrasing variants. The LLM is a stub that sleeps --llm-ms per call, so
+# no Gemini key is needed. Reports hit ratio and latency with/without cache.
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from answer_cache import AnswerCache  # noqa: E402
+
+TOPICS = [
+    "what is the address of ganpat university",
+    "when was ganpat university established",
+    "who is the vice chancellor of ganpat university",
+    "how many institutes are there in ganpat university",
+    "is ganpat university naac accredited",
+    "what courses does ganpat university offer",
+    "where is the library",
+    "what are the library timings",
+    "does ganpat university have a hostel",
+    "how far is ganpat university from ahmedabad",
+    "what is the website of ganpat university",
+    "who founded ganpat university",
+]
+
+PREFIXES = ["", "please tell me ", "can you tell me ", "hey ", "kindly tell "]
+SUFFIXES = ["", "?", "??", " please", "!"]
+
+
+def synthetic_log(n: int, s: float = 1.1):
+    """Questions drawn Zipf-like over TOPICS with random casing/phrasing"""
+    weights = [1 / (rank ** s) for rank in range(1, len(TOPICS) + 1)]
+    log = []
+    for topic in random.choices(TOPICS, weights=weights, k=n):
+        q = random.choice(PREFIXES) + topic + random.choice(SUFFIXES)
+        log.append(q.upper() if random.random() < 0.1 else q.capitalize())
+    return log
+
+
+async def stub_llm(question: str, delay: float) -> str:
+    await asyncio.sleep(delay)
+    return f"Answer to: {question}"
+
+
+async def replay(log, delay: float, cache=None):
+    samples, llm_calls = [], 0
+    for question in log:
+        start = time.perf_counter()
+        reply = cache.get(question) if cache else None
+        if reply is None:
+            reply = await stub_llm(question, delay)
+            llm_calls += 1
+            if cache:
+                cache.set(question, reply)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples, llm_calls
+
+
+def report(label, samples, llm_calls):
+    ordered = sorted(samples)
+    p95 = ordered[int(0.95 * (len(ordered) - 1))]
+    print(f"{label:>14}: llm_calls={llm_calls} mean={statistics.mean(samples):.2f}ms "
+          f"p50={statistics.median(samples):.3f}ms p95={p95:.2f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="GENERAL answer cache replay")
+    parser.add_argument("--log", help="file with one question per line")
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--llm-ms", type=float, default=800)
+    parser.add_argument("--similarity", type=float, default=0.0)
+    args = parser.parse_args()
+
+    random.seed(9)
+    if args.log:
+        with open(args.log, encoding="utf-8") as f:
+            log = [line.strip() for line in f if line.strip()]
+    else:
+        log = synthetic_log(args.requests)
+    delay = args.llm_ms / 1000
+
+    # Without the cache every request pays the LLM; model it instead of sleeping through it
+    report("no cache", [args.llm_ms] * len(log), len(log))
+
+    cache = AnswerCache(max_entries=2000, ttl=24 * 3600, max_bytes=8 * 1024 * 1024,
+                        similarity=args.similarity)
+    samples, llm_calls = asyncio.run(replay(log, delay, cache))
+    report("answer cache", samples, llm_calls)
+    print(f"stats: {cache.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+# bench_batch_schedule.py - Legacy string_to_array timetable join vs batch_schedule view
+#
+# Usage (from backend/, against a database with migrations applied):
+#   python benchmarks/bench_batch_schedule.py [--rounds 50] [--batches 10]
+#
+# Runs both timetable queries for the same (batch, day) pairs and reports
+# client-side latency plus the server-side execution time from EXPLAIN ANALYZE.
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db import get_connection, close_pool  # noqa: E402
+from main import build_batch_timetable_sql  # noqa: E402
+
+LEGACY_BATCH_TIMETABLE_SQL = """
+SELECT
+    b.name AS batch_name,
+    s.name AS subject_name,
+    l.lesson_type,
+    c.period,
+    c.days,
+    cr.name AS classroom_name,
+    p.start_time,
+    p.end_time
+FROM batch b
+JOIN "group" g ON g.class_id = b.class_id
+JOIN lesson l ON g.group_id::text = ANY(
+    string_to_array(trim(both '{}' from l.group_ids), ',')
+)
+JOIN card c ON c.lesson_id = l.lesson_id
+JOIN subject s ON s.subject_id = l.subject_id
+JOIN classroom cr ON cr.classroom_id = ANY(
+    string_to_array(trim(both '{}' from l.classroom_ids), ',')
+)
+JOIN periods p ON p.period = c.period
+WHERE b.name = $1
+  AND c.days = $2
+ORDER BY p.start_time;
+"""
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+async def time_query(conn, sql, pairs, rounds):
+    samples = []
+    for _ in range(rounds):
+        for params in pairs:
+            start = time.perf_counter()
+            await conn.fetch(sql, *params)
+            samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+async def explain_ms(conn, sql, params):
+    plan = await conn.fetchval("EXPLAIN (ANALYZE, FORMAT JSON) " + sql.strip().rstrip(";"), *params)
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]["Execution Time"]
+
+
+async def run(args):
+    async with get_connection() as conn:
+        pairs = [
+            (r["batch_name"], r["day_code"])
+            for r in await conn.fetch(
+                "SELECT DISTINCT batch_name, day_code FROM batch_schedule ORDER BY 1, 2 LIMIT $1",
+                args.batches,
+            )
+        ]
+        if not pairs:
+            print("batch_schedule is empty - nothing to benchmark")
+            return
+
+        new_sql, _ = build_batch_timetable_sql(*pairs[0])
+        for label, sql in (("legacy join", LEGACY_BATCH_TIMETABLE_SQL), ("batch_schedule", new_sql)):
+            await time_query(conn, sql, pairs, 1)  # warm up the statement cache
+            samples = await time_query(conn, sql, pairs, args.rounds)
+            server = [await explain_ms(conn, sql, p) for p in pairs]
+            print(
+                f"{label:>15}: n={len(samples)} "
+                f"p50={statistics.median(samples):.2f}ms "
+                f"p95={percentile(samples, 95):.2f}ms "
+                f"server exec avg={statistics.mean(server):.2f}ms"
+            )
+    await close_pool()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare legacy timetable join with batch_schedule")
+    parser.add_argument("--rounds", type=int, default=50)
+    parser.add_argument("--batches", type=int, default=10, help="Number of (batch, day) pairs to query")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+# bench_formatters.py - Reply rendering: template/list-join formatters vs the legacy ones
+#
+# Usage (from backend/):
+#   python benchmarks/bench_formatters.py [--rooms 500] [--batches 72] [--rounds 200]
+#
+# Renders 500-room free-room lists and full-week (Mon-Sat) batch timetables
+# with both implementations (the legacy ones read from git history, see
+# baseline.py), checks the replies are identical, then reports
+# microseconds per reply. The shared classroom_index is loaded with the
+# synthetic rooms, as at startup. No database needed.
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import time as clock
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+sys.path.insert(0, HERE)
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+import formatters  # noqa: E402
+from baseline import load_functions, load_module  # noqa: E402
+from classroom_index import classroom_index  # noqa: E402
+import main as app  # noqa: E402
+
+# Before replies were rendered with list joins and cached time slots
+LEGACY_REV = "c27f968~1"
+
+DAYS = ["MON", "TUE", "WED", "THU", "FRI", "SAT"]
+PERIODS = [(clock(9 + p, 0), clock(9 + p, 55)) for p in range(7)]
+
+
+def synthetic_rooms(n_rooms: int):
+    return [
+        {
+            "classroom_id": f"R{i}",
+            "classroom_name": f"{'Lab' if i % 4 == 0 else 'Room'} {100 + i}",
+            "name": f"{'Lab' if i % 4 == 0 else 'Room'} {100 + i}",
+            "short": f"R{100 + i}",
+        }
+        for i in range(n_rooms)
+    ]
+
+
+def synthetic_week():
+    """One day's rows per weekday, as fetch_batch_timetable returns them"""
+    week = {}
+    for day in DAYS:
+        week[day] = [
+            {
+                "start_time": start,
+                "end_time": end,
+                "subject_name": random.choice(["Operating Systems", "Compiler Design", "Machine Learning"]),
+                "classroom_name": f"Room {random.randint(100, 400)}",
+                "teacher_name": "Prof. Manan D Thakkar",
+                "lesson_type": random.choice(["lab", "lecture"]),
+            }
+            for start, end in PERIODS
+        ]
+    return week
+
+
+def cases(n_rooms: int, n_batches: int):
+    legacy_main = load_functions("legacy_main", LEGACY_REV, "backend/main.py", [
+        "format_timetable_response", "iter_timetable_response",
+        "format_free_rooms_response", "iter_free_rooms_response",
+    ])
+    legacy_formatters = load_module("legacy_formatters", LEGACY_REV, "backend/formatters.py")
+    rooms = synthetic_rooms(n_rooms)
+    classroom_index.load(rooms)
+    free_rooms = classroom_index.rooms  # what room_occupancy.free_rooms returns
+    occupied = [r["classroom_id"] for r in rooms if random.random() < 0.35]
+    room_context = {"time_info": {"start_time": "10:00:00", "end_time": "11:00:00", "day": "TUE"}}
+    weeks = {f"{1 + b % 8}CE-{'ABCDEF'[b // 8 % 6]}-{1 + b // 48}": synthetic_week() for b in range(n_batches)}
+
+    def timetable_week(format_timetable):
+        def run():
+            return [format_timetable(rows, {"class_batch_name": batch, "day": day})
+                    for batch, week in weeks.items() for day, rows in week.items()]
+        return run
+
+    def formatter_week(formatter):
+        def run():
+            return [formatter.format(rows, {"class_batch_name": batch, "day": day, "class_batch_type": "batch"})
+                    for batch, week in weeks.items() for day, rows in week.items()]
+        return run
+
+    return [
+        (f"main free rooms ({n_rooms} rooms)",
+         lambda: legacy_main.format_free_rooms_response(free_rooms),
+         lambda: app.format_free_rooms_response(free_rooms), 1),
+        (f"RoomAvailabilityFormatter ({n_rooms} rooms)",
+         lambda: legacy_formatters.RoomAvailabilityFormatter().format(rooms, occupied, room_context),
+         lambda: formatters.RoomAvailabilityFormatter().format(rooms, occupied, room_context), 1),
+        (f"main timetable (week x {n_batches} batches)",
+         timetable_week(legacy_main.format_timetable_response),
+         timetable_week(app.format_timetable_response), len(weeks) * len(DAYS)),
+        (f"TimetableFormatter (week x {n_batches} batches)",
+         formatter_week(legacy_formatters.TimetableFormatter()),
+         formatter_week(formatters.TimetableFormatter()), len(weeks) * len(DAYS)),
+    ]
+
+
+def timed(fn, rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark reply formatters")
+    parser.add_argument("--rooms", type=int, default=500)
+    parser.add_argument("--batches", type=int, default=72)
+    parser.add_argument("--rounds", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    random.seed(args.seed)
+
+    failures = 0
+    print(f"{'case':<44} {'legacy µs':>10} {'new µs':>10} {'speedup':>8}")
+    for name, old, new, replies in cases(args.rooms, args.batches):
+        if old() != new():
+            failures += 1
+            print(f"MISMATCH: {name}")
+            continue
+        rounds = max(1, args.rounds // replies)
+        old_s, new_s = timed(old, rounds), timed(new, rounds)
+        per_reply = 1e6 / (rounds * replies)
+        print(f"{name:<44} {old_s * per_reply:>10.1f} {new_s * per_reply:>10.1f} {old_s / new_s:>7.2f}x")
+
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+# bench_llm_offload.py - DB-path latency while GENERAL (LLM) queries are in flight
+#
+# Usage (from backend/):
+#   python benchmarks/bench_llm_offload.py [--llm-latency 0.5] [--llm-calls 8] [--db-queries 600]
+#
+# Replaces the Gemini client with a local stub and compares two modes:
+#   blocking - the old behaviour, a synchronous call inside the event loop
+#   async    - llm.generate_content (async client + semaphore + timeout)
+# A stream of simulated DB lookups runs for the whole run with the LLM calls
+# spread evenly through it. Percentiles are reported for the lookups that
+# overlapped an LLM call (and for all lookups); they should stay flat in
+# async mode.
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import llm  # noqa: E402
+
+
+class StubModels:
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def generate_content(self, **kwargs):
+        time.sleep(self.latency)
+        return SimpleNamespace(text="Stub answer.")
+
+
+class StubAsyncModels(StubModels):
+    async def generate_content(self, **kwargs):
+        await asyncio.sleep(self.latency)
+        return SimpleNamespace(text="Stub answer.")
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    idx = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[idx]
+
+
+class LLMActivity:
+    """LLM calls in flight, and how many have started so far"""
+
+    def __init__(self):
+        self.active = 0
+        self.started = 0
+
+    def overlapped(self, started_before: int, active_before: int) -> bool:
+        """Whether an LLM call was in flight at some point since (started_before, active_before)"""
+        return active_before > 0 or self.active > 0 or self.started != started_before
+
+
+async def fake_db_query(db_latency: float, activity: LLMActivity, samples: list, during_llm: list):
+    started_before, active_before = activity.started, activity.active
+    start = time.perf_counter()
+    await asyncio.sleep(db_latency)
+    elapsed = (time.perf_counter() - start) * 1000
+    samples.append(elapsed)
+    if activity.overlapped(started_before, active_before):
+        during_llm.append(elapsed)
+
+
+async def run_mode(mode: str, args):
+    """(all DB samples, DB samples that overlapped an LLM call) in ms"""
+    stub_client = SimpleNamespace(
+        models=StubModels(args.llm_latency),
+        aio=SimpleNamespace(models=StubAsyncModels(args.llm_latency)),
+    )
+    llm.client = stub_client
+    llm._semaphore = None
+    activity = LLMActivity()
+
+    async def blocking_call():
+        await asyncio.sleep(0)
+        stub_client.models.generate_content(model="stub", contents="q", config=None)
+
+    async def llm_call():
+        activity.started += 1
+        activity.active += 1
+        try:
+            if mode == "blocking":
+                await blocking_call()
+            else:
+                await llm.answer_general_question("what is the address of ganpat university")
+        finally:
+            activity.active -= 1
+
+    # Spread the LLM calls evenly over the DB stream, so DB lookups run before,
+    # during and after each one for the whole run
+    every = max(1, args.db_queries // (args.llm_calls + 1))
+    samples, during_llm, llm_tasks = [], [], []
+    for i in range(1, args.db_queries + 1):
+        asyncio.create_task(fake_db_query(args.db_latency, activity, samples, during_llm))
+        if i % every == 0 and len(llm_tasks) < args.llm_calls:
+            llm_tasks.append(asyncio.create_task(llm_call()))
+        await asyncio.sleep(args.db_interval)
+
+    await asyncio.gather(*llm_tasks)
+    while len(samples) < args.db_queries:
+        await asyncio.sleep(args.db_latency)
+    return samples, during_llm
+
+
+def describe(label: str, samples: list) -> str:
+    if not samples:
+        return f"{label}: n=0"
+    return (f"{label}: n={len(samples)} p50={statistics.median(samples):.1f}ms "
+            f"p99={percentile(samples, 99):.1f}ms max={max(samples):.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="DB-path latency while LLM calls are in flight")
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="Stub LLM latency in seconds")
+    parser.add_argument("--llm-calls", type=int, default=8, help="GENERAL queries spread over the run")
+    parser.add_argument("--db-queries", type=int, default=600, help="Simulated DB lookups")
+    parser.add_argument("--db-latency", type=float, default=0.002, help="Simulated DB latency in seconds")
+    parser.add_argument("--db-interval", type=float, default=0.005, help="Gap between DB lookups in seconds")
+    args = parser.parse_args()
+
+    for mode in ("blocking", "async"):
+        samples, during_llm = asyncio.run(run_mode(mode, args))
+        print(f"{mode:>8}: {describe('DB during LLM', during_llm)} | {describe('all DB', samples)}")
+
+
+if __name__ == "__main__":
+    main()
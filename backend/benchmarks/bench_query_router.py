@@ -0,0 +1,98 @@
+# bench_query_router.py - Golden-output check and micro-benchmark for query_router
+#
+# Usage (from backend/):
+#   python benchmarks/bench_query_router.py            # check + benchmark
+#   python benchmarks/bench_query_router.py --check    # golden check only
+#
+# golden_queries.json holds the query type and context produced by the
+# original (pre-compilation) router for a corpus of real-world phrasings,
+# plus cases for the later WEEK_TIMETABLE routing (a batch with no day, or a
+# week phrase), with the clock frozen at "frozen_now". Every case must still match.
+# The benchmark times classify() against that router, read from git history
+# (baseline.py); --check needs no git.
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+sys.path.insert(0, HERE)
+
+import query_router  # noqa: E402
+from baseline import load_module  # noqa: E402
+
+GOLDEN_PATH = os.path.join(HERE, "golden_queries.json")
+# The router before patterns were compiled and classify() scanned once (timing baseline only)
+LEGACY_ROUTER = ("825efc3~1", "backend/query_router.py")
+
+
+def freeze_clock(module, frozen: datetime):
+    class FrozenDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return frozen
+
+    module.datetime = FrozenDatetime
+
+
+def check(golden) -> int:
+    failures = 0
+    for case in golden["cases"]:
+        message = case["message"]
+        expected_ctx = case["context"]
+
+        ctx = query_router.classify(message)
+        ctx.pop("detected_at")
+        detected = query_router.detect_query_type(message)
+        legacy_ctx = query_router.build_query_context(message, detected)
+        legacy_ctx.pop("detected_at")
+
+        if detected != case["query_type"] or ctx != expected_ctx or legacy_ctx != expected_ctx:
+            failures += 1
+            print(f"MISMATCH: {message!r}\n  expected {case['query_type']} {expected_ctx}\n  got      {detected} {ctx}")
+
+    print(f"golden: {len(golden['cases']) - failures}/{len(golden['cases'])} cases match")
+    return failures
+
+
+def bench(messages, rounds, frozen: datetime):
+    legacy_query_router = load_module("legacy_query_router", *LEGACY_ROUTER)
+    freeze_clock(legacy_query_router, frozen)
+
+    def legacy(message):
+        qt = legacy_query_router.detect_query_type(message)
+        return legacy_query_router.build_query_context(message, qt)
+
+    for label, fn in (("legacy", legacy), ("classify", query_router.classify)):
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for message in messages:
+                fn(message)
+        elapsed = time.perf_counter() - start
+        per_call = elapsed / (rounds * len(messages)) * 1e6
+        print(f"{label:>9}: {per_call:.1f}us per message ({rounds * len(messages)} messages)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="query_router golden check and benchmark")
+    parser.add_argument("--check", action="store_true", help="Only run the golden-output check")
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    with open(GOLDEN_PATH, encoding="utf-8") as f:
+        golden = json.load(f)
+    frozen = datetime.fromisoformat(golden["frozen_now"])
+    freeze_clock(query_router, frozen)
+
+    failures = check(golden)
+    if not args.check:
+        bench([c["message"] for c in golden["cases"]], args.rounds, frozen)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+# bench_result_rows.py - Allocations per request: asyncpg records vs dict(row) copies
+#
+# Usage (from backend/, DB_* env vars pointing at a seeded scratch database):
+#   DB_NAME=bench python benchmarks/bench_result_rows.py [--rooms 2000] [--rounds 50]
+#
+# Fetches and formats large free-room lists and timetables the way /chat does,
+# once with the records fetch_query_async returns and once with as_dict=True
+# (the old per-row dict copies). Checks the replies are identical, then
+# reports, per request, the peak Python memory traced by tracemalloc, the
+# bytes/blocks the result rows keep alive, and the time per request. The
+# peak never drops below ~256 KiB: that is asyncio's socket read buffer.
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+import main as app  # noqa: E402
+from db import fetch_query_async, close_pool, DB_CONFIG  # noqa: E402
+
+# free-room columns for any number of rooms, independent of the seeded classroom table
+SYNTHETIC_ROOMS_SQL = """
+SELECT 'R' || g AS classroom_id,
+       CASE WHEN g % 4 = 0 THEN 'Lab ' ELSE 'Room ' END || (100 + g) AS classroom_name
+FROM generate_series(1, $1) g;
+"""
+
+# every batch's classes on one day: the timetable columns, many rows
+DAY_SCHEDULE_SQL = """
+SELECT
+    batch_name,
+    subject AS subject_name,
+    lesson_type,
+    period,
+    day_code AS days,
+    classroom AS classroom_name,
+    start_time,
+    end_time
+FROM batch_schedule
+WHERE day_code = $1
+ORDER BY batch_name, start_time;
+"""
+
+
+async def cases(n_rooms: int):
+    batch = (await fetch_query_async("SELECT name FROM batch ORDER BY name LIMIT 1"))[0]["name"]
+    free_sql, free_params = app.build_free_rooms_time_sql("00:00:00", "00:00:00")
+    week_sql, week_params = app.build_week_timetable_sql(batch)
+    context = {"class_batch_name": batch, "day": "MON"}
+    return [
+        ("free rooms (classroom table)", free_sql, free_params, app.format_free_rooms_response),
+        (f"free rooms ({n_rooms} synthetic)", SYNTHETIC_ROOMS_SQL, (n_rooms,), app.format_free_rooms_response),
+        (f"week timetable ({batch})", week_sql, week_params, lambda rows: app.format_timetable_response(rows, context)),
+        ("all batches, one day", DAY_SCHEDULE_SQL, ("100000",), lambda rows: app.format_timetable_response(rows, context)),
+    ]
+
+
+async def request(sql, params, render, as_dict: bool):
+    rows = await fetch_query_async(sql, params, as_dict=as_dict)
+    return rows, render(rows)
+
+
+async def measure(sql, params, render, as_dict: bool, rounds: int):
+    """(rows, peak bytes per request, bytes and blocks held by the rows, µs per request)"""
+    await request(sql, params, render, as_dict)  # warm the statement cache
+
+    tracemalloc.start()
+    peaks = []
+    for _ in range(rounds):
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        await request(sql, params, render, as_dict)
+        peaks.append(tracemalloc.get_traced_memory()[1] - base)
+
+    await asyncio.sleep(0)  # let the loop drop its handle on the last request's result
+    before = tracemalloc.take_snapshot()
+    rows, _ = await request(sql, params, render, as_dict)
+    held = tracemalloc.take_snapshot().compare_to(before, "filename")
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        await request(sql, params, render, as_dict)
+    elapsed = time.perf_counter() - start
+
+    held_bytes = sum(stat.size_diff for stat in held if stat.size_diff > 0)
+    held_blocks = sum(stat.count_diff for stat in held if stat.count_diff > 0)
+    return rows, sorted(peaks)[len(peaks) // 2], held_bytes, held_blocks, elapsed / rounds * 1e6
+
+
+async def run(args):
+    failures = 0
+    print(f"database: {DB_CONFIG['database']}\n")
+    print(f"{'case':<32} {'rows':>6} {'mode':>7} {'peak KiB':>9} {'held KiB':>9} {'blocks':>7} {'µs/req':>8}")
+    for name, sql, params, render in await cases(args.rooms):
+        replies = {}
+        for mode, as_dict in (("dict", True), ("record", False)):
+            rows, peak, held_bytes, held_blocks, micros = await measure(sql, params, render, as_dict, args.rounds)
+            replies[mode] = render(rows)
+            print(f"{name:<32} {len(rows):>6} {mode:>7} {peak / 1024:>9.1f} {held_bytes / 1024:>9.1f} "
+                  f"{held_blocks:>7} {micros:>8.0f}")
+        if replies["dict"] != replies["record"]:
+            failures += 1
+            print(f"MISMATCH: {name}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark result row allocations")
+    parser.add_argument("--rooms", type=int, default=2000)
+    parser.add_argument("--rounds", type=int, default=50)
+    args = parser.parse_args()
+
+    async def bench():
+        try:
+            return await run(args)
+        finally:
+            await close_pool()
+
+    if asyncio.run(bench()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+# bench_room_occupancy.py - Latency of the in-memory room-occupancy engine
+#
+# Usage (from backend/):
+#   python benchmarks/bench_room_occupancy.py [--rooms 500] [--queries 10000]
+#
+# Builds a synthetic campus (no database needed) and times single-range,
+# multi-slot and "free for the next N minutes" lookups.
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import time as clock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from room_occupancy import RoomOccupancyIndex  # noqa: E402
+
+
+def synthetic_campus(n_rooms: int, periods_per_day: int = 7):
+    rooms = [
+        {"classroom_id": f"R{i}", "classroom_name": f"{'Lab' if i % 4 == 0 else 'Room'} {100 + i}"}
+        for i in range(n_rooms)
+    ]
+    bookings = []
+    for room in rooms:
+        for p in range(periods_per_day):
+            if random.random() < 0.6:
+                bookings.append({
+                    "classroom_id": room["classroom_id"],
+                    "start_time": clock(9 + p, 0),
+                    "end_time": clock(9 + p, 55),
+                })
+    return rooms, bookings
+
+
+def timed(fn, queries):
+    samples = []
+    for args in queries:
+        start = time.perf_counter()
+        fn(*args)
+        samples.append((time.perf_counter() - start) * 1e6)
+    return samples
+
+
+def report(label, samples):
+    ordered = sorted(samples)
+    p99 = ordered[int(0.99 * (len(ordered) - 1))]
+    print(f"{label:>18}: p50={statistics.median(samples):.1f}us p99={p99:.1f}us")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Room-occupancy engine latency")
+    parser.add_argument("--rooms", type=int, default=500)
+    parser.add_argument("--queries", type=int, default=10000)
+    args = parser.parse_args()
+
+    random.seed(7)
+    rooms, bookings = synthetic_campus(args.rooms)
+    index = RoomOccupancyIndex()
+    start = time.perf_counter()
+    index.load(rooms, bookings)
+    print(f"loaded {len(rooms)} rooms / {len(bookings)} bookings in {(time.perf_counter() - start) * 1000:.1f}ms")
+
+    def rand_time():
+        return clock(random.randint(8, 16), random.choice([0, 15, 30, 45]))
+
+    single = [(t, clock(t.hour + 1, t.minute)) for t in (rand_time() for _ in range(args.queries))]
+    multi = [([(clock(9, 0), clock(10, 0)), (clock(14, 0), clock(15, 0))],) for _ in range(args.queries)]
+    duration = [(rand_time(), 120) for _ in range(args.queries)]
+
+    report("free_rooms", timed(index.free_rooms, single))
+    report("free_rooms_multi", timed(index.free_rooms_multi, multi))
+    report("free_for(120min)", timed(index.free_for, duration))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+# bench_serialization.py - JSON serialization of the largest reply shapes
+#
+# Usage (from backend/):
+#   python benchmarks/bench_serialization.py [--rooms 500] [--batch 50] [--rounds 500]
+#
+# Serializes week timetables (rows with datetime.time values), free-room
+# lists, /chat/batch replies and person records three ways:
+#   stdlib     - a plain dict returned to FastAPI: jsonable_encoder + JSONResponse
+#   encoder    - the same with FastJSONResponse as the default class: jsonable_encoder + orjson
+#   direct     - FastJSONResponse returned by the endpoint: orjson only
+# checks all three decode to the same JSON, then reports microseconds per
+# response. No database needed.
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from datetime import time as clock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+
+import main as app  # noqa: E402
+from responses import FastJSONResponse  # noqa: E402
+from schema_context import BINARY_TO_DAY  # noqa: E402
+
+DAY_CODES = ["100000", "010000", "001000", "000100", "000010", "000001"]
+PERIODS = [(clock(9 + p, 0), clock(9 + p, 55)) for p in range(7)]
+SUBJECTS = ["Operating Systems", "Compiler Design", "Machine Learning", "Cyber Security"]
+
+
+def week_rows(batch: str):
+    return {
+        day: [
+            {
+                "batch_name": batch,
+                "subject_name": random.choice(SUBJECTS),
+                "lesson_type": random.choice(["lab", "lecture"]),
+                "period": period,
+                "days": day,
+                "classroom_name": f"Room {random.randint(100, 400)}",
+                "start_time": start,
+                "end_time": end,
+            }
+            for period, (start, end) in enumerate(PERIODS, 1)
+        ]
+        for day in DAY_CODES
+    }
+
+
+def student(i: int):
+    return {
+        "person_type": "student",
+        "enrollment_no": f"22{i:09d}",
+        "name": f"Student {i}",
+        "branch": "CE",
+        "semester": 1 + i % 8,
+        "class": f"{1 + i % 8}CE-A",
+        "batch": f"{1 + i % 8}CE-A-{1 + i % 3}",
+        "student_phone_no": f"98{i:08d}",
+        "parents_phone_no": f"97{i:08d}",
+        "student_gnu_mail_id": f"22{i:09d}@gnu.ac.in",
+    }
+
+
+def payloads(n_rooms: int, n_batch: int):
+    batch = "7CE-A-1"
+    week = week_rows(batch)
+    rooms = [
+        {"classroom_id": f"R{i}", "classroom_name": f"{'Lab' if i % 4 == 0 else 'Room'} {100 + i}",
+         "short": f"R{100 + i}", "is_lab": i % 4 == 0}
+        for i in range(n_rooms)
+    ]
+    replies = [
+        {"reply": app.format_timetable_response(rows, {"class_batch_name": batch, "day": BINARY_TO_DAY[day][:3].upper()}),
+         "result_count": len(rows)}
+        for day, rows in list(week.items()) * (n_batch // len(week) + 1)
+    ][:n_batch]
+    return [
+        ("week timetable (/timetable/{batch}/week)", {
+            "batch": batch,
+            "days": [{"day": BINARY_TO_DAY[day], "day_code": day, "entries": rows} for day, rows in week.items()],
+            "reply": app.format_week_timetable_response(week, batch),
+        }),
+        (f"free rooms ({n_rooms}, /rooms/free)", {"day": "010000", "count": len(rooms), "free_rooms": rooms}),
+        (f"/chat/batch ({n_batch} timetable replies)", {"replies": replies}),
+        (f"person records ({n_batch} rows)", {"results": [student(i) for i in range(n_batch)]}),
+    ]
+
+
+def stdlib(payload):
+    return JSONResponse(jsonable_encoder(payload)).body
+
+
+def encoder(payload):
+    return FastJSONResponse(jsonable_encoder(payload)).body
+
+
+def direct(payload):
+    return FastJSONResponse(payload).body
+
+
+def timed(fn, payload, rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn(payload)
+    return (time.perf_counter() - start) / rounds * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark JSON response serialization")
+    parser.add_argument("--rooms", type=int, default=500)
+    parser.add_argument("--batch", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    random.seed(args.seed)
+
+    failures = 0
+    print(f"{'payload':<42} {'KiB':>6} {'stdlib µs':>10} {'encoder µs':>11} {'direct µs':>10} {'speedup':>8}")
+    for name, payload in payloads(args.rooms, args.batch):
+        bodies = [fn(payload) for fn in (stdlib, encoder, direct)]
+        if any(json.loads(body) != json.loads(bodies[0]) for body in bodies[1:]):
+            failures += 1
+            print(f"MISMATCH: {name}")
+            continue
+        base, via_encoder, fast = (timed(fn, payload, args.rounds) for fn in (stdlib, encoder, direct))
+        print(f"{name:<42} {len(bodies[2]) / 1024:>6.1f} {base:>10.1f} {via_encoder:>11.1f} {fast:>10.1f} "
+              f"{base / fast:>7.1f}x")
+
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+# load_chat.py - Replay a realistic QueryType mix against /chat and report latency
+#
+# Usage (from backend/), fully offline:
+#   DB_NAME=bench python benchmarks/seed_synthetic_data.py --reset
+#   DB_NAME=bench python benchmarks/load_chat.py --start-server [--requests 3000] [--concurrency 32]
+#
+# --start-server launches benchmarks/stub_gemini.py and uvicorn main:app (with
+# GEMINI_BASE_URL pointing at the stub) and stops both afterwards. Without it,
+# the driver targets an already running server at --url. Messages are built
+# from benchmarks/synthetic_manifest.json; results are reported per QueryType
+# as throughput and p50/p95/p99 latency (--json writes them to a file too).
+# Replies that found nothing for an identifier taken from the manifest
+# ("Please provide...", "No matching person found") are counted as misses:
+# they mean the message never exercised the lookup it was meant to.
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(BENCH_DIR)
+MANIFEST_PATH = os.path.join(BENCH_DIR, "synthetic_manifest.json")
+
+# Share of each QueryType in the replayed traffic
+DEFAULT_MIX = {
+    "PERSON_LOOKUP": 30,
+    "BATCH_TIMETABLE": 20,
+    "WEEK_TIMETABLE": 5,
+    "WHERE_IS_BATCH": 15,
+    "ROOM_AVAILABILITY": 15,
+    "GENERAL": 10,
+    "GREETING": 5,
+}
+
+DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday"]
+# Replies that mean a lookup found nothing (or never ran)
+MISS_MARKERS = ("Please provide a name", "No matching person found")
+
+TITLE_RE = re.compile(r"^(?:prof|dr|mr|mrs|ms)\.?\s+", re.IGNORECASE)
+
+GENERAL_QUESTIONS = [
+    "What is the address of Ganpat University?",
+    "When was Ganpat University established?",
+    "Is GUNI NAAC accredited?",
+    "Which colleges are part of Ganpat University?",
+    "Does the university have hostel facilities?",
+    "What is the Japan-India Institute for Manufacturing?",
+]
+
+
+def build_message(query_type: str, manifest: dict, rng: random.Random) -> str:
+    if query_type == "PERSON_LOOKUP":
+        kind = rng.choices(["enrollment", "name", "phone", "email", "teacher", "short"],
+                           weights=[40, 20, 10, 10, 10, 10])[0]
+        if kind == "enrollment":
+            return f"details of {rng.choice(manifest['enrollments'])}"
+        if kind == "name":
+            return f"who is {rng.choice(manifest['student_names'])}"
+        if kind == "phone":
+            return f"whose phone number is {rng.choice(manifest['phones'])}"
+        if kind == "email":
+            return f"student with email {rng.choice(manifest['emails'])}"
+        if kind == "teacher":
+            # The router reads a leading "Prof."/"Dr." as the name itself
+            return f"details of {TITLE_RE.sub('', rng.choice(manifest['teacher_names']))}"
+        return f"who is {rng.choice(manifest['teacher_shorts'])}"
+    if query_type == "BATCH_TIMETABLE":
+        return f"timetable of {rng.choice(manifest['batches'])} on {rng.choice(DAYS)}"
+    if query_type == "WEEK_TIMETABLE":
+        return f"{rng.choice(manifest['batches'])} timetable for the whole week"
+    if query_type == "WHERE_IS_BATCH":
+        return f"where is {rng.choice(manifest['batches'])} right now"
+    if query_type == "ROOM_AVAILABILITY":
+        return rng.choice([
+            "which rooms are free now",
+            f"free classrooms from {rng.randint(9, 15)}:00 to {rng.randint(16, 17)}:00",
+            "empty labs for the next 2 hours",
+        ])
+    if query_type == "GENERAL":
+        return rng.choice(GENERAL_QUESTIONS)
+    return rng.choice(["hi", "hello", "good morning"])
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+async def drive(url: str, workload, concurrency: int):
+    """Send (query_type, message) pairs with `concurrency` workers; returns per-type latencies/errors"""
+    queue: asyncio.Queue = asyncio.Queue()
+    for item in workload:
+        queue.put_nowait(item)
+    latencies = {t: [] for t, _ in workload}
+    errors = {t: 0 for t, _ in workload}
+    misses = {t: 0 for t, _ in workload}
+
+    async def worker(client: httpx.AsyncClient):
+        while not queue.empty():
+            query_type, message = queue.get_nowait()
+            start = time.perf_counter()
+            missed = False
+            try:
+                response = await client.post(f"{url}/chat", json={"message": message})
+                body = response.json()
+                reply = body.get("reply", "")
+                failed = response.status_code != 200 or "error" in body or "Database error" in reply
+                missed = not failed and reply.startswith(MISS_MARKERS)
+            except (httpx.HTTPError, ValueError):
+                failed = True
+            latencies[query_type].append((time.perf_counter() - start) * 1000)
+            errors[query_type] += failed
+            misses[query_type] += missed
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(limits=limits, timeout=60) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    return latencies, errors, misses, elapsed
+
+
+def report(latencies, errors, misses, elapsed):
+    total = sum(len(v) for v in latencies.values())
+    rows = []
+    print(f"{total} requests in {elapsed:.1f}s -> {total / elapsed:.1f} req/s\n")
+    print(f"{'query_type':<18} {'n':>6} {'err':>5} {'miss':>5} {'req/s':>8} {'mean':>8} {'p50':>8} {'p95':>8} {'p99':>8}  (ms)")
+    for query_type in sorted(latencies):
+        samples = latencies[query_type]
+        if not samples:
+            continue
+        row = {
+            "query_type": query_type,
+            "n": len(samples),
+            "errors": errors[query_type],
+            "misses": misses[query_type],
+            "throughput": len(samples) / elapsed,
+            "mean_ms": statistics.mean(samples),
+            "p50_ms": percentile(samples, 50),
+            "p95_ms": percentile(samples, 95),
+            "p99_ms": percentile(samples, 99),
+        }
+        rows.append(row)
+        print(f"{query_type:<18} {row['n']:>6} {row['errors']:>5} {row['misses']:>5} {row['throughput']:>8.1f} {row['mean_ms']:>8.1f} "
+              f"{row['p50_ms']:>8.1f} {row['p95_ms']:>8.1f} {row['p99_ms']:>8.1f}")
+    return {"requests": total, "seconds": elapsed, "throughput": total / elapsed, "by_type": rows}
+
+
+def wait_until_up(url: str, timeout: float = 30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(url, timeout=1).status_code < 500:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise SystemExit(f"{url} did not come up within {timeout:.0f}s")
+
+
+def start_servers(port: int, stub_port: int, workers: int):
+    """Start the Gemini stub and the app (pointed at the stub); returns the processes"""
+    stub = subprocess.Popen(
+        [sys.executable, os.path.join(BENCH_DIR, "stub_gemini.py"), "--port", str(stub_port)],
+        cwd=BACKEND_DIR,
+    )
+    env = dict(os.environ, GEMINI_BASE_URL=f"http://127.0.0.1:{stub_port}", LOG_LEVEL=os.getenv("LOG_LEVEL", "WARNING"))
+    app = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--workers", str(workers),
+         "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env,
+    )
+    wait_until_up(f"http://127.0.0.1:{stub_port}/docs")
+    wait_until_up(f"http://127.0.0.1:{port}/health")
+    return [stub, app]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a QueryType mix against /chat")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--mix", help="e.g. PERSON_LOOKUP=50,GENERAL=50 (default: realistic mix)")
+    parser.add_argument("--manifest", default=MANIFEST_PATH)
+    parser.add_argument("--seed", type=int, default=23)
+    parser.add_argument("--json", help="also write the results to this file")
+    parser.add_argument("--start-server", action="store_true", help="launch stub Gemini + uvicorn main:app")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--stub-port", type=int, default=8099)
+    parser.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args()
+
+    mix = DEFAULT_MIX
+    if args.mix:
+        mix = {k.strip(): float(v) for k, v in (pair.split("=") for pair in args.mix.split(","))}
+    with open(args.manifest, encoding="utf-8") as f:
+        manifest = json.load(f)
+
+    rng = random.Random(args.seed)
+    types_ = rng.choices(list(mix), weights=list(mix.values()), k=args.requests)
+    workload = [(t, build_message(t, manifest, rng)) for t in types_]
+
+    processes = []
+    url = args.url
+    if args.start_server:
+        processes = start_servers(args.port, args.stub_port, args.workers)
+        url = f"http://127.0.0.1:{args.port}"
+    try:
+        # Warm-up: fill pools and in-process indexes before measuring
+        asyncio.run(drive(url, workload[: min(50, len(workload))], min(4, args.concurrency)))
+        results = report(*asyncio.run(drive(url, workload, args.concurrency)))
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.wait()
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=1)
+
+
+if __name__ == "__main__":
+    main()
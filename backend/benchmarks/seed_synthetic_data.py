@@ -0,0 +1,217 @@
+# seed_synthetic_data.py - Fill a scratch Postgres database with a synthetic campus
+#
+# Usage (from backend/, DB_* env vars pointing at a THROWAWAY database):
+#   python benchmarks/seed_synthetic_data.py --reset [--students 20000] [--teachers 300]
+#                                            [--classes 24] [--rooms 120] [--seed 17]
+#
+# Creates the tables main.py reads (student_enrollment_information,
+# teacher_enrollment_info, batch, "group", lesson, card, subject, classroom,
+# periods, session), fills them with deterministic fake data, applies
+# migrations/ and writes benchmarks/synthetic_manifest.json with identifiers
+# load_chat.py uses to build realistic questions. Needs no network access.
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+from datetime import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db import get_connection, close_pool, DB_CONFIG  # noqa: E402
+from migrate import apply_migrations  # noqa: E402
+
+MANIFEST_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "synthetic_manifest.json")
+
+TABLES = [
+    "student_enrollment_information", "teacher_enrollment_info", "batch", '"group"',
+    "lesson", "card", "subject", "classroom", "periods", "session",
+]
+
+DDL = """
+CREATE TABLE IF NOT EXISTS student_enrollment_information (
+    enrollment_no text PRIMARY KEY,
+    name_of_student text,
+    branch text,
+    semester int,
+    class text,
+    batch text,
+    gender text,
+    student_phone_no text,
+    parents_phone_no text,
+    student_gnu_mail_id text,
+    student_personal_mail_id text,
+    hosteller_commuters text,
+    user_id text
+);
+CREATE TABLE IF NOT EXISTS teacher_enrollment_info (
+    user_id text PRIMARY KEY,
+    tt_display_full_name text,
+    email_id text,
+    short text
+);
+CREATE TABLE IF NOT EXISTS batch (batch_id serial PRIMARY KEY, name text, class_id text);
+CREATE TABLE IF NOT EXISTS "group" (group_id text PRIMARY KEY, class_id text, name text);
+CREATE TABLE IF NOT EXISTS subject (subject_id text PRIMARY KEY, name text);
+CREATE TABLE IF NOT EXISTS classroom (classroom_id text PRIMARY KEY, name text, short text);
+CREATE TABLE IF NOT EXISTS lesson (
+    lesson_id text PRIMARY KEY,
+    subject_id text,
+    group_ids text,
+    classroom_ids text,
+    lesson_type text
+);
+CREATE TABLE IF NOT EXISTS card (card_id serial PRIMARY KEY, lesson_id text, period int, days text);
+CREATE TABLE IF NOT EXISTS periods (period int PRIMARY KEY, start_time time, end_time time);
+CREATE TABLE IF NOT EXISTS session (
+    session_id serial PRIMARY KEY,
+    classroom_id text,
+    start_time text,
+    end_time text
+);
+"""
+
+FIRST_NAMES = [
+    "Aarav", "Vivaan", "Aditya", "Shashank", "Manan", "Riya", "Archie", "Sesha", "Diya", "Kavya",
+    "Ishaan", "Meera", "Rohan", "Pooja", "Harsh", "Nidhi", "Yash", "Krupa", "Dhruv", "Janvi",
+]
+LAST_NAMES = [
+    "Patel", "Shah", "Mehta", "Thakkar", "Desai", "Joshi", "Rao", "Singh", "Kumar", "Trivedi",
+    "Parikh", "Bhatt", "Modi", "Chauhan", "Pandya",
+]
+BRANCHES = ["CE", "IT", "CSE", "EC"]
+SUBJECTS = [
+    "Operating Systems", "Computer Networks", "Compiler Design", "Machine Learning",
+    "Database Management", "Software Engineering", "Cloud Computing", "Data Structures",
+    "Web Technologies", "Cyber Security", "Artificial Intelligence", "Theory of Computation",
+]
+DAY_CODES = ["100000", "010000", "001000", "000100", "000010", "000001"]
+PERIODS_PER_DAY = 7
+
+
+def person_name(rng: random.Random) -> str:
+    return f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+
+
+async def seed(args):
+    rng = random.Random(args.seed)
+    manifest = {"enrollments": [], "phones": [], "emails": [], "student_names": [],
+                "teacher_names": [], "teacher_shorts": [], "teacher_ids": [], "batches": []}
+
+    async with get_connection() as conn:
+        if args.reset:
+            await conn.execute("DROP MATERIALIZED VIEW IF EXISTS batch_schedule")
+            await conn.execute("DROP TABLE IF EXISTS schema_migrations")
+            await conn.execute("DROP TABLE IF EXISTS " + ", ".join(TABLES))
+        await conn.execute(DDL)
+        if await conn.fetchval("SELECT count(*) FROM student_enrollment_information"):
+            raise SystemExit("Tables already hold data; re-run with --reset (drops them) on a scratch database")
+
+        await conn.executemany(
+            "INSERT INTO periods VALUES ($1, $2, $3)",
+            [(p, time(8 + p, 0), time(8 + p, 55)) for p in range(1, PERIODS_PER_DAY + 1)],
+        )
+        rooms = [(f"R{i}", f"{'Lab' if i % 4 == 0 else 'Room'} {100 + i}", f"R{100 + i}") for i in range(args.rooms)]
+        await conn.executemany("INSERT INTO classroom VALUES ($1, $2, $3)", rooms)
+        await conn.executemany(
+            "INSERT INTO subject VALUES ($1, $2)",
+            [(f"S{i}", name) for i, name in enumerate(SUBJECTS)],
+        )
+
+        groups, batches, lessons, cards = [], [], [], []
+        for c in range(args.classes):
+            semester = 1 + c % 8
+            branch = BRANCHES[c // 8 % len(BRANCHES)]
+            class_name = f"{semester}{branch}-{'ABCDEF'[c % 6]}"
+            class_id = f"C{c}"
+            groups.append((f"G{c}", class_id, class_name))
+            for b in range(1, 4):
+                batches.append((f"{class_name}-{b}", class_id))
+            for day in DAY_CODES:
+                for period in range(1, PERIODS_PER_DAY):
+                    lesson_id = f"L{len(lessons)}"
+                    lesson_type = "lab" if rng.random() < 0.3 else "lecture"
+                    lessons.append((lesson_id, f"S{rng.randrange(len(SUBJECTS))}", f"{{G{c}}}",
+                                    f"{{R{rng.randrange(args.rooms)}}}", lesson_type))
+                    cards.append((lesson_id, period, day))
+
+        await conn.executemany('INSERT INTO "group" VALUES ($1, $2, $3)', groups)
+        await conn.executemany("INSERT INTO batch (name, class_id) VALUES ($1, $2)", batches)
+        await conn.executemany("INSERT INTO lesson VALUES ($1, $2, $3, $4, $5)", lessons)
+        await conn.executemany("INSERT INTO card (lesson_id, period, days) VALUES ($1, $2, $3)", cards)
+        await conn.executemany(
+            "INSERT INTO session (classroom_id, start_time, end_time) VALUES ($1, $2, $3)",
+            [(f"R{rng.randrange(args.rooms)}", f"{h}:00:00", f"{h}:55:00")
+             for h in range(9, 9 + PERIODS_PER_DAY) for _ in range(args.rooms // 3)],
+        )
+
+        students = []
+        for i in range(args.students):
+            group = groups[i % len(groups)]
+            enrollment_no = f"22{i:09d}"
+            name = person_name(rng)
+            students.append((
+                enrollment_no, name, BRANCHES[i % len(BRANCHES)], int(group[2][0]), group[2],
+                f"{group[2]}-{1 + i % 3}", rng.choice("mf"), f"98{i:08d}", f"97{i:08d}",
+                f"{enrollment_no}@gnu.ac.in", f"{name.split()[0].lower()}{i}@gmail.com",
+                rng.choice(["hosteller", "commuter"]), enrollment_no,
+            ))
+        await conn.executemany(
+            "INSERT INTO student_enrollment_information VALUES "
+            "($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13)",
+            students,
+        )
+
+        teachers = []
+        for i in range(args.teachers):
+            first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+            middle = rng.choice("ABCDEFGHJKMNPRST")
+            short = f"{first[0]}{middle}{last[0]}"
+            teachers.append((f"{10000 + i}", f"{rng.choice(['Prof.', 'Dr.'])} {first} {middle} {last}",
+                             f"{short.lower()}{i:02d}@gnu.ac.in", short))
+        await conn.executemany("INSERT INTO teacher_enrollment_info VALUES ($1, $2, $3, $4)", teachers)
+
+    sample = rng.sample(students, min(500, len(students)))
+    manifest["enrollments"] = [s[0] for s in sample]
+    manifest["phones"] = [s[7] for s in sample[:100]]
+    # Personal addresses: "<enrollment>@gnu.ac.in" is routed as an enrollment-number lookup
+    manifest["emails"] = [s[10] for s in sample[:100]]
+    manifest["student_names"] = sorted({s[1] for s in sample})[:100]
+    manifest["teacher_names"] = [t[1].split(" ", 1)[1] for t in teachers[:100]]  # without the title
+    manifest["teacher_shorts"] = sorted({t[3] for t in teachers})[:100]
+    manifest["teacher_ids"] = [t[0] for t in teachers[:100]]
+    manifest["batches"] = [b[0] for b in batches]
+    with open(MANIFEST_PATH, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1)
+
+    print(f"manifest: {MANIFEST_PATH}")
+
+    applied = await apply_migrations()
+    print(f"seeded {DB_CONFIG['database']}: {len(students)} students, {len(teachers)} teachers, "
+          f"{len(batches)} batches, {len(rooms)} rooms, {len(cards)} cards; "
+          f"migrations applied: {applied or 'none'}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Seed a scratch database with a synthetic campus")
+    parser.add_argument("--students", type=int, default=20000)
+    parser.add_argument("--teachers", type=int, default=300)
+    parser.add_argument("--classes", type=int, default=24)
+    parser.add_argument("--rooms", type=int, default=120)
+    parser.add_argument("--seed", type=int, default=17)
+    parser.add_argument("--reset", action="store_true", help="drop the campus tables first")
+    args = parser.parse_args()
+
+    async def run():
+        try:
+            await seed(args)
+        finally:
+            await close_pool()
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
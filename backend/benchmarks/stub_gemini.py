@@ -0,0 +1,96 @@
+# stub_gemini.py - Offline stand-in for the Gemini REST API
+#
+# Usage (from backend/):
+#   python benchmarks/stub_gemini.py [--port 8099] [--latency-ms 600] [--jitter-ms 200]
+#   GEMINI_BASE_URL=http://127.0.0.1:8099 uvicorn main:app
+#
+# Answers generateContent and streamGenerateContent (alt=sse) for any model
+# with a canned reply after a configurable delay, so /chat GENERAL queries
+# can be load-tested without network access or an API key.
+
+import argparse
+import asyncio
+import json
+import random
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+STUB_CONFIG = {
+    "latency": 0.6,  # seconds before the (first) response chunk
+    "jitter": 0.2,
+    "chunks": 8,  # streamed replies are split into this many chunks
+}
+
+CANNED_REPLY = (
+    "Ganpat University is a State Private University in Ganpat Vidyanagar, on the "
+    "Mehsana-Gozaria Highway in North Gujarat (PIN 384012). It was established on "
+    "April 12, 2005 and is recognized by the UGC with an A grade from NAAC."
+)
+
+app = FastAPI(title="Gemini stub")
+
+
+def _delay() -> float:
+    return max(0.0, STUB_CONFIG["latency"] + random.uniform(-1, 1) * STUB_CONFIG["jitter"])
+
+
+def _response(text: str, model: str, finished: bool = True) -> dict:
+    candidate = {"content": {"parts": [{"text": text}], "role": "model"}, "index": 0}
+    if finished:
+        candidate["finishReason"] = "STOP"
+    return {
+        "candidates": [candidate],
+        "usageMetadata": {"promptTokenCount": 600, "candidatesTokenCount": len(text.split())},
+        "modelVersion": model,
+    }
+
+
+def _split(text: str, parts: int):
+    words = text.split(" ")
+    size = max(1, -(-len(words) // parts))
+    for i in range(0, len(words), size):
+        yield " ".join(words[i:i + size]) + (" " if i + size < len(words) else "")
+
+
+@app.post("/{api_version}/models/{model_action}")
+async def models_endpoint(api_version: str, model_action: str, request: Request):
+    model, _, action = model_action.partition(":")
+    await request.body()
+
+    if action == "generateContent":
+        await asyncio.sleep(_delay())
+        return JSONResponse(_response(CANNED_REPLY, model))
+
+    if action == "streamGenerateContent":
+        chunks = list(_split(CANNED_REPLY, STUB_CONFIG["chunks"]))
+
+        async def events():
+            await asyncio.sleep(_delay())
+            for i, chunk in enumerate(chunks):
+                if i:
+                    await asyncio.sleep(0.02)
+                yield f"data: {json.dumps(_response(chunk, model, i == len(chunks) - 1))}\r\n\r\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    return JSONResponse({"error": {"code": 404, "message": f"Unsupported action {action}"}}, status_code=404)
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Offline Gemini API stub")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--latency-ms", type=float, default=600)
+    parser.add_argument("--jitter-ms", type=float, default=200)
+    args = parser.parse_args()
+
+    STUB_CONFIG["latency"] = args.latency_ms / 1000
+    STUB_CONFIG["jitter"] = args.jitter_ms / 1000
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+# cache.py - Small in-process TTL + LRU cache with a memory bound
+
+import sys
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterator, Optional, Tuple
+
+
+def estimate_size(value: Any) -> int:
+    """Approximate memory footprint of cached query results (lists of dicts/records of scalars)"""
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        for k, v in value.items():
+            size += sys.getsizeof(k) + estimate_size(v)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            size += estimate_size(item)
+    elif hasattr(value, 'values'):
+        # asyncpg.Record: column names live in a descriptor shared by the whole result
+        for v in value.values():
+            size += estimate_size(v)
+    return size
+
+
+class TTLCache:
+    """
+    LRU cache whose entries expire after ttl seconds.
+    Evicts least-recently-used entries when either max_entries or max_bytes
+    (estimated with estimate_size) is exceeded.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 600, max_bytes: int = 16 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()  # key -> (expires_at, size, value)
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+
+        expires_at, _, value = entry
+        if expires_at < time.monotonic():
+            self._remove(key)
+            self.misses += 1
+            return default
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        size = estimate_size(value)
+        if size > self.max_bytes:
+            return
+
+        if key in self._data:
+            self._remove(key)
+
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        self._data[key] = (expires_at, size, value)
+        self._bytes += size
+
+        while len(self._data) > self.max_entries or self._bytes > self.max_bytes:
+            oldest = next(iter(self._data))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def invalidate(self, predicate: Optional[Callable[[Hashable], bool]] = None) -> int:
+        """Drop entries whose key matches predicate (all entries if None). Returns count removed."""
+        keys = [k for k in self._data if predicate is None or predicate(k)]
+        for key in keys:
+            self._remove(key)
+        return len(keys)
+
+    def clear(self):
+        self.invalidate()
+
+    def items(self) -> Iterator[Tuple[Hashable, Any, float]]:
+        """Live entries as (key, value, seconds until expiry), least recently used first"""
+        now = time.monotonic()
+        for key, (expires_at, _, value) in list(self._data.items()):
+            if expires_at >= now:
+                yield key, value, expires_at - now
+
+    def _remove(self, key: Hashable):
+        _, size, _ = self._data.pop(key)
+        self._bytes -= size
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        entry = self._data.get(key)
+        return entry is not None and entry[0] >= time.monotonic()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self._data),
+            "bytes": self._bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
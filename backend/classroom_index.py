@@ -0,0 +1,83 @@
+# classroom_index.py - Shared in-memory classroom metadata
+#
+# Built from the classroom table at startup (and on every schedule
+# reload/refresh). Gives O(1) id -> name lookups and a lab/classroom type
+# decided once per room at load time, for room_occupancy and the free-room
+# formatters.
+
+import logging
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from db import fetch_query_async
+from schedule import register_loader
+
+logger = logging.getLogger(__name__)
+
+CLASSROOMS_SQL = """
+SELECT classroom_id, name AS classroom_name, short
+FROM classroom
+ORDER BY name;
+"""
+
+
+def room_is_lab(name: Optional[str]) -> bool:
+    """Classify a room as a lab from its name"""
+    return 'lab' in (name or '').lower()
+
+
+def _indexed_room(row: Dict) -> Dict:
+    name = row.get('classroom_name', row.get('name'))
+    return dict(row, classroom_name=name or row.get('short') or 'Unknown', is_lab=room_is_lab(name))
+
+
+class ClassroomIndex:
+    """Classroom rows by classroom_id, each with a display name and precomputed is_lab"""
+
+    def __init__(self):
+        self.rooms: List[Dict] = []
+        self._by_id: Dict[str, Dict] = {}
+        self.loaded_at: Optional[datetime] = None
+
+    @property
+    def loaded(self) -> bool:
+        return self.loaded_at is not None
+
+    def load(self, rows: List[Dict]):
+        """Rebuild from classroom rows (CLASSROOMS_SQL columns, or raw name/short columns)"""
+        self.rooms = [_indexed_room(row) for row in rows]
+        self._by_id = {room['classroom_id']: room for room in self.rooms}
+        self.loaded_at = datetime.now()
+
+    def get(self, classroom_id: str) -> Optional[Dict]:
+        return self._by_id.get(classroom_id)
+
+    def name(self, classroom_id: str, default: Optional[str] = None) -> Optional[str]:
+        room = self._by_id.get(classroom_id)
+        return room['classroom_name'] if room else default
+
+    def entry(self, room: Dict) -> Dict:
+        """Indexed row for a room row's classroom_id; unknown rooms are classified on the spot"""
+        return self._by_id.get(room.get('classroom_id')) or _indexed_room(room)
+
+    def is_lab(self, room: Dict) -> bool:
+        """Lab flag for a room row: precomputed if the row or its id is indexed, else from its name"""
+        lab = room.get('is_lab')
+        if lab is None:
+            known = self._by_id.get(room.get('classroom_id'))
+            lab = known['is_lab'] if known else room_is_lab(room.get('classroom_name', room.get('name')))
+        return lab
+
+    def __len__(self) -> int:
+        return len(self.rooms)
+
+
+classroom_index = ClassroomIndex()
+
+
+@register_loader
+async def load_classroom_index():
+    """(Re)load classroom_index from the classroom table"""
+    rows = await fetch_query_async(CLASSROOMS_SQL)
+    classroom_index.load(rows)
+    logger.info("Classroom index loaded (%d rooms)", len(classroom_index))
@@ -1,12 +1,19 @@
 # db.py - Improved with async connection pooling
+import asyncio
 import asyncpg
+import logging
 import os
-from typing import List, Dict, Optional, Any
+import time
+from typing import List, Dict, Iterator, Optional, Any, Tuple
 from contextlib import asynccontextmanager
 
+import metrics
+
 # Global connection pool
 _pool: Optional[asyncpg.Pool] = None
 
+logger = logging.getLogger(__name__)
+
 # Database configuration
 DB_CONFIG = {
     "host": os.getenv("DB_HOST", "localhost"),
@@ -14,11 +21,77 @@ DB_CONFIG = {
     "user": os.getenv("DB_USER", "postgres"),
     "password": os.getenv("DB_PASSWORD", "12345"),
     "port": int(os.getenv("DB_PORT", "5432")),
-    "min_size": 5,  # Minimum number of connections in pool
-    "max_size": 20,  # Maximum number of connections in pool
-    "command_timeout": 30,  # 30 seconds timeout for queries
+    "min_size": int(os.getenv("DB_POOL_MIN_SIZE", "5")),  # Minimum number of connections in pool
+    "max_size": int(os.getenv("DB_POOL_MAX_SIZE", "20")),  # Maximum number of connections in pool
+    "command_timeout": float(os.getenv("DB_COMMAND_TIMEOUT", "30")),  # Seconds per query
+    "acquire_timeout": float(os.getenv("DB_ACQUIRE_TIMEOUT", "5")),  # Seconds to wait for a free connection before failing
+    "max_queries": int(os.getenv("DB_MAX_QUERIES", "50000")),  # Queries before a connection is replaced
+    "max_inactive_lifetime": float(os.getenv("DB_MAX_INACTIVE_LIFETIME", "300")),  # Idle seconds before a connection is closed
+    "search_path": os.getenv("DB_SEARCH_PATH"),  # Server default when unset
+    "jit": os.getenv("DB_JIT", "off"),  # JIT compilation costs more than it saves on these short queries
+    "statement_cache_size": int(os.getenv("DB_STATEMENT_CACHE_SIZE", "256")),  # Prepared statements cached per connection
+    "coalesce_queries": os.getenv("DB_COALESCE_QUERIES", "1") != "0",  # Identical concurrent SELECTs share one execution
 }
 
+# (query, params) run once on every new pooled connection (see prepare_on_connect)
+_hot_statements: List[Tuple[str, tuple]] = []
+
+# Acquire bookkeeping for pool_stats()
+_acquire_counts = {"waiting": 0, "acquired_total": 0, "timeouts": 0, "wait_seconds_total": 0.0, "wait_seconds_max": 0.0}
+
+
+class PoolTimeoutError(asyncio.TimeoutError):
+    """No pooled connection became free within DB_ACQUIRE_TIMEOUT"""
+
+# (query, params) -> task running that SELECT, while it is in flight (see fetch_query_async)
+_inflight: Dict[Tuple[str, tuple], asyncio.Future] = {}
+_coalesce_counts = {"executed": 0, "coalesced": 0}
+
+
+def prepare_on_connect(*statements: Tuple[str, tuple]):
+    """
+    Register hot (query, params) pairs to run once on every new pooled connection.
+    fetch() keeps the prepared statement in the connection's statement cache, so
+    the first real request on each connection skips the parse/plan round trip.
+    Params should be placeholders that match no rows. Call before the pool is
+    created (i.e. at import time); query texts must match what callers pass.
+    """
+    _hot_statements.extend(s for s in statements if s not in _hot_statements)
+
+
+async def _init_connection(conn: asyncpg.Connection):
+    """Pool init hook: warm the connection's statement cache with the hot statements"""
+    for query, params in _hot_statements:
+        try:
+            await conn.fetch(query, *params)
+        except asyncpg.PostgresError as e:
+            logger.warning("Could not prepare hot statement on connect: %s", e)
+
+
+def _connect_kwargs() -> Dict[str, Any]:
+    """asyncpg connect() arguments shared by the pool and standalone connections"""
+    server_settings = {"jit": DB_CONFIG["jit"]}
+    if DB_CONFIG["search_path"]:
+        server_settings["search_path"] = DB_CONFIG["search_path"]
+    return {
+        "host": DB_CONFIG["host"],
+        "database": DB_CONFIG["database"],
+        "user": DB_CONFIG["user"],
+        "password": DB_CONFIG["password"],
+        "port": DB_CONFIG["port"],
+        "command_timeout": DB_CONFIG["command_timeout"],
+        "statement_cache_size": DB_CONFIG["statement_cache_size"],
+        "server_settings": server_settings,
+    }
+
+
+async def connect() -> asyncpg.Connection:
+    """
+    Standalone connection outside the pool, e.g. for migrations that must run
+    before the pool warms its connections. The caller must close it.
+    """
+    return await asyncpg.connect(**_connect_kwargs())
+
 
 async def get_pool() -> asyncpg.Pool:
     """
@@ -28,16 +101,15 @@ async def get_pool() -> asyncpg.Pool:
     global _pool
     if _pool is None:
         _pool = await asyncpg.create_pool(
-            host=DB_CONFIG["host"],
-            database=DB_CONFIG["database"],
-            user=DB_CONFIG["user"],
-            password=DB_CONFIG["password"],
-            port=DB_CONFIG["port"],
             min_size=DB_CONFIG["min_size"],
             max_size=DB_CONFIG["max_size"],
-            command_timeout=DB_CONFIG["command_timeout"],
+            max_queries=DB_CONFIG["max_queries"],
+            max_inactive_connection_lifetime=DB_CONFIG["max_inactive_lifetime"],
+            init=_init_connection,
+            **_connect_kwargs(),
         )
-        print(f"✅ Database connection pool created (min={DB_CONFIG['min_size']}, max={DB_CONFIG['max_size']})")
+        logger.info("Database connection pool created (min=%d, max=%d, %d hot statements)",
+                    DB_CONFIG['min_size'], DB_CONFIG['max_size'], len(_hot_statements))
     return _pool
 
 
@@ -47,39 +119,142 @@ async def close_pool():
     if _pool:
         await _pool.close()
         _pool = None
-        print("✅ Database connection pool closed")
+        logger.info("Database connection pool closed")
+
+
+def pool_stats() -> Dict[str, float]:
+    """
+    Pool sizing data: connection counts, utilization (acquired / max_size),
+    callers queued for a connection, acquire wait times and timeouts.
+    Empty until the pool exists.
+    """
+    if _pool is None:
+        return {}
+    size = _pool.get_size()
+    idle = _pool.get_idle_size()
+    acquired_total = _acquire_counts["acquired_total"]
+    return {
+        "size": size,
+        "idle": idle,
+        "acquired": size - idle,
+        "min_size": _pool.get_min_size(),
+        "max_size": _pool.get_max_size(),
+        "utilization": (size - idle) / _pool.get_max_size(),
+        "waiting": _acquire_counts["waiting"],
+        "acquired_total": acquired_total,
+        "acquire_timeouts": _acquire_counts["timeouts"],
+        "wait_seconds_avg": _acquire_counts["wait_seconds_total"] / acquired_total if acquired_total else 0.0,
+        "wait_seconds_max": _acquire_counts["wait_seconds_max"],
+    }
 
 
 @asynccontextmanager
 async def get_connection():
-    """Context manager for getting a connection from the pool"""
+    """
+    Context manager for getting a connection from the pool. Fails fast with
+    PoolTimeoutError when none is free within DB_ACQUIRE_TIMEOUT.
+    """
     pool = await get_pool()
-    async with pool.acquire() as connection:
+    timeout = DB_CONFIG["acquire_timeout"]
+    start = time.perf_counter()
+    _acquire_counts["waiting"] += 1
+    try:
+        connection = await pool.acquire(timeout=timeout)
+    except asyncio.TimeoutError:
+        _acquire_counts["timeouts"] += 1
+        raise PoolTimeoutError(f"No database connection free within {timeout:g}s") from None
+    finally:
+        _acquire_counts["waiting"] -= 1
+    
+    waited = time.perf_counter() - start
+    _acquire_counts["acquired_total"] += 1
+    _acquire_counts["wait_seconds_total"] += waited
+    _acquire_counts["wait_seconds_max"] = max(_acquire_counts["wait_seconds_max"], waited)
+    metrics.POOL_ACQUIRE_SECONDS.observe((), waited)
+    try:
         yield connection
+    finally:
+        await pool.release(connection)
 
 
 async def fetch_query_async(
     query: str, 
-    params: Optional[tuple] = None
-) -> List[Dict[str, Any]]:
+    params: Optional[tuple] = None,
+    as_dict: bool = False,
+) -> List[asyncpg.Record]:
     """
-    Execute a SELECT query and return results as list of dictionaries.
+    Execute a SELECT query and return its rows.
+    
+    Rows are the asyncpg.Record objects as fetched: read-only mappings with
+    row['column'], row.get('column', default), keys()/values()/items() and
+    dict(row), so formatters can read large results (free-room lists, week
+    timetables) without allocating a dict per row. Pass as_dict=True for
+    mutable dicts, e.g. before handing rows to a JSON encoder.
+    
+    asyncpg prepares each distinct query text once per pooled connection and
+    reuses it from the statement cache, so callers should pass a fixed SQL
+    template with $1, $2... placeholders and the values in params.
+    
+    Concurrent calls with the same query and params share one execution (and
+    one pooled connection): the first caller runs it, later callers wait for
+    it and share its (immutable) records. Calls with unhashable params (e.g.
+    a list for ANY($1)) always run on their own. DB_COALESCE_QUERIES=0 disables this.
     
     Args:
         query: SQL query string
         params: Optional tuple of parameters for parameterized queries
+        as_dict: Return a list of dictionaries instead of records
         
     Returns:
-        List of dictionaries where keys are column names
+        List of records (or dictionaries) keyed by column name
     """
+    key = (query, params or ())
+    try:
+        task = _inflight.get(key) if DB_CONFIG["coalesce_queries"] else None
+    except TypeError:
+        task, key = None, None
+    
+    if task is not None:
+        _coalesce_counts["coalesced"] += 1
+        rows = list(await asyncio.shield(task))
+    else:
+        _coalesce_counts["executed"] += 1
+        if key is None or not DB_CONFIG["coalesce_queries"]:
+            rows = await _fetch(query, params)
+        else:
+            # Run in its own task so a cancelled caller doesn't cancel the query for the others
+            task = asyncio.ensure_future(_fetch(query, params))
+            _inflight[key] = task
+            task.add_done_callback(lambda done: _forget_inflight(key, done))
+            rows = await asyncio.shield(task)
+    
+    return [dict(row) for row in rows] if as_dict else rows
+
+
+async def _fetch(query: str, params: Optional[tuple]) -> List[asyncpg.Record]:
     async with get_connection() as conn:
         if params:
-            rows = await conn.fetch(query, *params)
-        else:
-            rows = await conn.fetch(query)
-        
-        # Convert asyncpg.Record objects to dictionaries
-        return [dict(row) for row in rows]
+            return await conn.fetch(query, *params)
+        return await conn.fetch(query)
+
+
+def _forget_inflight(key: Tuple[str, tuple], task: asyncio.Future):
+    if _inflight.get(key) is task:
+        del _inflight[key]
+    if not task.cancelled():
+        task.exception()  # Mark retrieved; every waiting caller has already been given it
+
+
+def coalesce_stats() -> Dict[str, float]:
+    """SELECTs executed vs. served from another caller's in-flight execution"""
+    executed, coalesced = _coalesce_counts["executed"], _coalesce_counts["coalesced"]
+    total = executed + coalesced
+    return {
+        "executed": executed,
+        "coalesced": coalesced,
+        "in_flight": len(_inflight),
+        "ratio": coalesced / total if total else 0.0,
+    }
 
 
 async def execute_query_async(
@@ -107,17 +282,19 @@ async def execute_query_async(
 
 async def fetch_one_async(
     query: str, 
-    params: Optional[tuple] = None
-) -> Optional[Dict[str, Any]]:
+    params: Optional[tuple] = None,
+    as_dict: bool = False,
+) -> Optional[asyncpg.Record]:
     """
     Fetch a single row from the database.
     
     Args:
         query: SQL query string
         params: Optional tuple of parameters
+        as_dict: Return a dictionary instead of the record
         
     Returns:
-        Dictionary with column names as keys, or None if no results
+        Record (or dictionary) keyed by column name, or None if no results
     """
     async with get_connection() as conn:
         if params:
@@ -125,7 +302,7 @@ async def fetch_one_async(
         else:
             row = await conn.fetchrow(query)
         
-        return dict(row) if row else None
+        return dict(row) if row and as_dict else row
 
 
 async def test_connection():
@@ -136,32 +313,110 @@ async def test_connection():
     test_query = "SELECT * FROM student_enrollment_information LIMIT 5"
     try:
         rows = await fetch_query_async(test_query)
-        print("✅ Database connection test successful!")
-        print(f"   Retrieved {len(rows)} sample records")
+        logger.info("Database connection test successful (%d sample records)", len(rows))
         for row in rows:
-            print(f"   - {row.get('name_of_student', 'N/A')} ({row.get('enrollment_no', 'N/A')})")
+            logger.debug("Sample record: %s (%s)", row.get('name_of_student', 'N/A'), row.get('enrollment_no', 'N/A'))
         return True
     except Exception as e:
-        print(f"❌ Database connection test failed: {e}")
+        logger.error("Database connection test failed: %s", e)
         raise
 
 
-# --- Optional: Synchronous wrappers for backward compatibility ---
-# (Only use if you have other parts of code that aren't async)
+# --- Synchronous helpers for scripts and admin tools ---
+# Backed by a thread-safe psycopg2 pool built from the same DB_CONFIG as the
+# async pool. Prefer the async API inside the app.
+
+import atexit
+import threading
+import uuid
+from contextlib import contextmanager
 
 import psycopg2
 from psycopg2.extras import RealDictCursor
+from psycopg2.pool import ThreadedConnectionPool
+
+_SYNC_POOL_MAX = int(os.getenv("DB_SYNC_POOL_MAX_SIZE", "5"))
+
+SYNC_POOL_CONFIG = {
+    # Connections opened up front and kept idle. putconn() closes any connection
+    # returned while this many are already idle, so a min below max turns every
+    # burst into reconnects; it defaults to max_size for that reason.
+    "min_size": min(int(os.getenv("DB_SYNC_POOL_MIN_SIZE", str(_SYNC_POOL_MAX))), _SYNC_POOL_MAX),
+    "max_size": _SYNC_POOL_MAX,
+    "stream_batch_size": int(os.getenv("DB_STREAM_BATCH_SIZE", "2000")),  # Rows per server-side cursor fetch
+}
+
+_sync_pool: Optional[ThreadedConnectionPool] = None
+_sync_pool_lock = threading.Lock()
+# ThreadedConnectionPool raises instead of waiting when exhausted; callers queue here
+_sync_slots = threading.BoundedSemaphore(SYNC_POOL_CONFIG["max_size"])
+
+
+def _sync_connect_kwargs() -> Dict[str, Any]:
+    """psycopg2 connect() arguments matching the async pool's connection settings"""
+    options = [f"-c jit={DB_CONFIG['jit']}", f"-c statement_timeout={int(DB_CONFIG['command_timeout'] * 1000)}"]
+    if DB_CONFIG["search_path"]:
+        options.append(f"-c search_path={DB_CONFIG['search_path']}")
+    return {
+        "host": DB_CONFIG["host"],
+        "database": DB_CONFIG["database"],
+        "user": DB_CONFIG["user"],
+        "password": DB_CONFIG["password"],
+        "port": DB_CONFIG["port"],
+        "options": " ".join(options),
+    }
 
 
 def get_sync_connection():
-    """Synchronous connection (legacy support)"""
-    return psycopg2.connect(
-        host=DB_CONFIG["host"],
-        database=DB_CONFIG["database"],
-        user=DB_CONFIG["user"],
-        password=DB_CONFIG["password"],
-        port=DB_CONFIG["port"]
-    )
+    """Standalone synchronous connection (legacy support); the caller must close it"""
+    return psycopg2.connect(**_sync_connect_kwargs())
+
+
+def get_sync_pool() -> ThreadedConnectionPool:
+    """Get or create the synchronous connection pool (closed at interpreter exit)"""
+    global _sync_pool
+    with _sync_pool_lock:
+        if _sync_pool is None:
+            _sync_pool = ThreadedConnectionPool(
+                SYNC_POOL_CONFIG["min_size"], SYNC_POOL_CONFIG["max_size"], **_sync_connect_kwargs())
+            atexit.register(close_sync_pool)
+            logger.info("Sync connection pool created (min=%d, max=%d)",
+                        SYNC_POOL_CONFIG["min_size"], SYNC_POOL_CONFIG["max_size"])
+        return _sync_pool
+
+
+def close_sync_pool():
+    """Close every connection in the synchronous pool"""
+    global _sync_pool
+    with _sync_pool_lock:
+        if _sync_pool is not None:
+            _sync_pool.closeall()
+            _sync_pool = None
+
+
+@contextmanager
+def sync_connection():
+    """
+    Pooled synchronous connection: commits on success, rolls back on error and is
+    returned to the pool either way. Waits up to DB_ACQUIRE_TIMEOUT for a free one.
+    """
+    if not _sync_slots.acquire(timeout=DB_CONFIG["acquire_timeout"]):
+        raise PoolTimeoutError(f"No database connection free within {DB_CONFIG['acquire_timeout']:g}s")
+    pool = conn = None
+    try:
+        pool = get_sync_pool()
+        conn = pool.getconn()
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            if not conn.closed:
+                conn.rollback()
+            raise
+    finally:
+        if conn is not None:
+            pool.putconn(conn, close=bool(conn.closed))
+        _sync_slots.release()
 
 
 def fetch_query(query: str, params=None) -> List[Dict]:
@@ -169,28 +424,38 @@ def fetch_query(query: str, params=None) -> List[Dict]:
     Synchronous version of fetch_query.
     NOTE: Prefer using fetch_query_async in async contexts.
     """
-    conn = get_sync_connection()
-    cursor = conn.cursor(cursor_factory=RealDictCursor)
-    cursor.execute(query, params)
-    rows = cursor.fetchall()
-    cursor.close()
-    conn.close()
-    return rows
+    with sync_connection() as conn:
+        with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+            cursor.execute(query, params)
+            return cursor.fetchall()
+
+
+def stream_query(query: str, params=None, batch_size: Optional[int] = None) -> Iterator[Dict]:
+    """
+    Yield rows of a large SELECT through a server-side cursor, batch_size rows
+    per round trip, without loading the whole result into memory. The pooled
+    connection is held until the generator is exhausted or closed.
+    """
+    with sync_connection() as conn:
+        with conn.cursor(name=f"stream_{uuid.uuid4().hex}", cursor_factory=RealDictCursor) as cursor:
+            cursor.itersize = batch_size or SYNC_POOL_CONFIG["stream_batch_size"]
+            cursor.execute(query, params)
+            yield from cursor
 
 
 def execute_query(query: str, params=None):
     """Synchronous execute (legacy support)"""
-    conn = get_sync_connection()
-    cursor = conn.cursor()
-    cursor.execute(query, params)
-    conn.commit()
-    cursor.close()
-    conn.close()
+    with sync_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute(query, params)
 
 
 # --- Example usage ---
 if __name__ == "__main__":
     import asyncio
+    from log import setup_logging
+
+    setup_logging()
     
     async def main():
         print("Testing database connection...")
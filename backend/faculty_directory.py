@@ -0,0 +1,140 @@
+# faculty_directory.py - In-memory faculty index for teacher lookups
+#
+# Built from teacher_enrollment_info at startup (and on every schedule
+# reload/refresh, or POST /admin/faculty/refresh). Resolves abbreviations
+# such as "MDT" -> Prof. Manan D Thakkar, initials, name words, email
+# prefixes and employee ids with dict lookups instead of a LIKE scan.
+
+import logging
+import re
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional, Set
+
+from db import fetch_query_async
+from name_search import normalize_name
+from schedule import register_loader
+
+logger = logging.getLogger(__name__)
+
+FACULTY_SQL = """
+SELECT
+    'teacher' as person_type,
+    user_id as employee_id,
+    tt_display_full_name as name,
+    email_id as email,
+    short
+FROM teacher_enrollment_info;
+"""
+
+_NON_ALPHA = re.compile(r'[^A-Za-z]')
+
+# match_score of a directory hit, on name_search's scale so merge_name_matches can rank
+# teachers against trigram student matches: 1.0 is an exact key or the query found
+# verbatim in the name (the SQL's LIKE case); initials are the weakest kind of hit
+EXACT_MATCH_SCORE = 1.0
+TOKEN_MATCH_SCORE = 0.8
+INITIALS_MATCH_SCORE = 0.6
+
+
+def initials(normalized_name: str) -> List[str]:
+    """Initials a name is known by: every word ("MDT") and first + last ("MT")"""
+    words = normalized_name.split()
+    if len(words) < 2:
+        return []
+    every = ''.join(w[0] for w in words).upper()
+    first_last = (words[0][0] + words[-1][0]).upper()
+    return [every] if every == first_last else [every, first_last]
+
+
+class FacultyDirectory:
+    """Teacher rows indexed by short code, initials, name words, email prefix and employee id"""
+
+    def __init__(self):
+        self.teachers: List[Dict] = []
+        self._names: List[str] = []
+        self._by_id: Dict[str, int] = {}
+        self._by_short: Dict[str, List[int]] = {}
+        self._by_initials: Dict[str, List[int]] = {}
+        self._by_email_prefix: Dict[str, List[int]] = {}
+        self._by_name: Dict[str, List[int]] = {}
+        self._by_token: Dict[str, Set[int]] = {}
+        self.loaded_at: Optional[datetime] = None
+
+    @property
+    def loaded(self) -> bool:
+        return self.loaded_at is not None
+
+    def load(self, rows: List[Dict]):
+        """Rebuild every index from teacher rows (FACULTY_SQL columns)"""
+        by_id, by_short, by_initials = {}, defaultdict(list), defaultdict(list)
+        by_email_prefix, by_name, by_token = defaultdict(list), defaultdict(list), defaultdict(set)
+
+        teachers = [dict(row) for row in rows]
+        names = [normalize_name(teacher.get('name') or '') for teacher in teachers]
+        for i, teacher in enumerate(teachers):
+            if teacher.get('employee_id') is not None:
+                by_id[str(teacher['employee_id'])] = i
+            if teacher.get('short'):
+                by_short[_NON_ALPHA.sub('', teacher['short']).upper()].append(i)
+            if teacher.get('email'):
+                by_email_prefix[teacher['email'].split('@', 1)[0].lower()].append(i)
+
+            name = names[i]
+            if not name:
+                continue
+            by_name[name].append(i)
+            for code in initials(name):
+                by_initials[code].append(i)
+            for token in name.split():
+                by_token[token].add(i)
+
+        self.teachers, self._names = teachers, names
+        self._by_id, self._by_short, self._by_initials = by_id, dict(by_short), dict(by_initials)
+        self._by_email_prefix, self._by_name, self._by_token = dict(by_email_prefix), dict(by_name), dict(by_token)
+        self.loaded_at = datetime.now()
+
+    def by_employee_id(self, employee_id: str) -> Optional[Dict]:
+        i = self._by_id.get(str(employee_id).strip())
+        return self.teachers[i] if i is not None else None
+
+    def lookup(self, query: str) -> List[Dict]:
+        """
+        Teachers matching a name-ish query, most specific index first:
+        short code, email prefix, initials, full name, then all name words.
+        Each row is a copy carrying the match_score of its kind of hit.
+        Returns [] when nothing matches (callers may fall back to fuzzy SQL).
+        """
+        compact = _NON_ALPHA.sub('', query).upper()
+        normalized = normalize_name(query)
+        words = normalized.split()
+
+        hits, score = None, EXACT_MATCH_SCORE
+        if len(words) <= 1 and compact:
+            hits = self._by_short.get(compact) or self._by_email_prefix.get(query.strip().lower())
+            if not hits:
+                hits, score = self._by_initials.get(compact), INITIALS_MATCH_SCORE
+        if not hits and normalized:
+            hits, score = self._by_name.get(normalized), EXACT_MATCH_SCORE
+        if not hits and words:
+            matching = set.intersection(*(self._by_token.get(w, set()) for w in words))
+            return [
+                dict(self.teachers[i],
+                     match_score=EXACT_MATCH_SCORE if normalized in self._names[i] else TOKEN_MATCH_SCORE)
+                for i in sorted(matching)
+            ]
+        return [dict(self.teachers[i], match_score=score) for i in hits or []]
+
+    def __len__(self) -> int:
+        return len(self.teachers)
+
+
+faculty_directory = FacultyDirectory()
+
+
+@register_loader
+async def load_faculty_directory():
+    """(Re)load faculty_directory from teacher_enrollment_info"""
+    rows = await fetch_query_async(FACULTY_SQL)
+    faculty_directory.load(rows)
+    logger.info("Faculty directory loaded (%d teachers)", len(faculty_directory))
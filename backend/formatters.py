@@ -1,8 +1,61 @@
 # formatters.py - CORRECTED response formatting
 
+import logging
+from functools import lru_cache
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 
+from classroom_index import ClassroomIndex, classroom_index
+
+logger = logging.getLogger(__name__)
+
+# ============================================================================
+# RENDERING HELPERS (also used by main.py)
+# ============================================================================
+# Replies are built as a list of lines joined once (f-strings compile to a
+# single BUILD_STRING; str.format templates measured ~3x slower per row).
+# Only a few dozen period boundaries exist, so their HH:MM strings are cached
+# instead of re-formatted for every row.
+
+DAY_NAMES = {
+    'MON': 'Monday',
+    'TUE': 'Tuesday',
+    'WED': 'Wednesday',
+    'THU': 'Thursday',
+    'FRI': 'Friday',
+    'SAT': 'Saturday',
+    'SUN': 'Sunday',
+}
+
+
+@lru_cache(maxsize=1024)
+def clock_str(value) -> str:
+    """'HH:MM' for a time/datetime or a 'HH:MM:SS' string; 'N/A' when missing"""
+    if not value:
+        return 'N/A'
+    if hasattr(value, 'strftime'):
+        return value.strftime('%H:%M')
+    return str(value)[:5]
+
+
+@lru_cache(maxsize=1024)
+def time_slot(start, end, separator: str = ' - ') -> str:
+    """'HH:MM - HH:MM' for a period, cached per (start, end)"""
+    return clock_str(start) + separator + clock_str(end)
+
+
+def bullet_lines(items: List[str], bullet: str) -> str:
+    """One bullet line per item, built with a single join"""
+    if not items:
+        return ""
+    return bullet + ("\n" + bullet).join(items) + "\n"
+
+
+@lru_cache(maxsize=64)
+def is_lab(lesson_type) -> bool:
+    """Whether a lesson_type value mentions a lab"""
+    return 'lab' in str(lesson_type).lower()
+
 # ============================================================================
 # BASE FORMATTER
 # ============================================================================
@@ -36,44 +89,31 @@ class TimetableFormatter(BaseFormatter):
         
         # Build header
         emoji = "📚" if not is_batch else "🔬"
-        header = f"{emoji} Timetable – {class_batch_name} ({day_full})\n"
-        header += "─" * 75 + "\n\n"
+        header = f"{emoji} Timetable – {class_batch_name} ({day_full})\n" + "─" * 75 + "\n\n"
         
         # Build table rows
         rows = []
         for idx, entry in enumerate(results, 1):
-            time_slot = self._format_time_slot(
-                entry.get('start_time'),
-                entry.get('end_time')
-            )
-            
-            subject = entry.get('subject_name', 'N/A')
-            classroom = entry.get('classroom_name', 'N/A')
-            teacher = entry.get('teacher_name', 'Not Assigned')
             lesson_type = entry.get('lesson_type', 'lecture')
+            lab = lesson_type.lower() == 'lab'
             
             # Determine audience
             if entry.get('batch_name'):
-                audience = f"Batch: {entry.get('batch_name')}"
+                audience = f"Batch: {entry['batch_name']}"
             elif entry.get('group_name'):
-                audience = f"Batch: {entry.get('group_name')}"
+                audience = f"Batch: {entry['group_name']}"
             elif entry.get('class_name'):
-                audience = f"Class: {entry.get('class_name')}"
+                audience = f"Class: {entry['class_name']}"
             else:
                 audience = "Class Lecture"
             
-            # Format type emoji
-            type_emoji = "🔬" if lesson_type.lower() == 'lab' else "📖"
-            type_text = "Lab" if lesson_type.lower() == 'lab' else "Lecture"
-            
-            # Build row with number prefix
-            row = f"{idx}️⃣  {time_slot}\n"
-            row += f"    📚 {subject}\n"
-            row += f"    👨‍🏫 {teacher}\n"
-            row += f"    🏫 {classroom}\n"
-            row += f"    {type_emoji} {type_text} | {audience}\n"
-            
-            rows.append(row)
+            rows.append(
+                f"{idx}️⃣  {self._format_time_slot(entry.get('start_time'), entry.get('end_time'))}\n"
+                f"    📚 {entry.get('subject_name', 'N/A')}\n"
+                f"    👨‍🏫 {entry.get('teacher_name', 'Not Assigned')}\n"
+                f"    🏫 {entry.get('classroom_name', 'N/A')}\n"
+                f"    {'🔬' if lab else '📖'} {'Lab' if lab else 'Lecture'} | {audience}\n"
+            )
         
         if not rows:
             return self._format_no_results(context)
@@ -85,30 +125,11 @@ class TimetableFormatter(BaseFormatter):
         if not start_time or not end_time:
             return "N/A"
         
-        if hasattr(start_time, 'strftime'):
-            start_str = start_time.strftime('%H:%M')
-        else:
-            start_str = str(start_time)[:5]
-        
-        if hasattr(end_time, 'strftime'):
-            end_str = end_time.strftime('%H:%M')
-        else:
-            end_str = str(end_time)[:5]
-        
-        return f"⏰ {start_str} – {end_str}"
+        return "⏰ " + time_slot(start_time, end_time, " – ")
     
     def _get_full_day_name(self, day_code: str) -> str:
         """Convert day code to full name"""
-        day_map = {
-            'MON': 'Monday',
-            'TUE': 'Tuesday',
-            'WED': 'Wednesday',
-            'THU': 'Thursday',
-            'FRI': 'Friday',
-            'SAT': 'Saturday',
-            'SUN': 'Sunday',
-        }
-        return day_map.get(day_code, day_code)
+        return DAY_NAMES.get(day_code, day_code)
     
     def _format_no_results(self, context: Dict) -> str:
         """Format message when no results found"""
@@ -151,29 +172,15 @@ class WhereIsBatchFormatter(BaseFormatter):
         start_time = entry.get('start_time')
         end_time = entry.get('end_time')
         
-        # Format times
-        if hasattr(start_time, 'strftime'):
-            start_str = start_time.strftime('%H:%M')
-        else:
-            start_str = str(start_time)[:5] if start_time else 'N/A'
+        lab = lesson_type.lower() == 'lab'
         
-        if hasattr(end_time, 'strftime'):
-            end_str = end_time.strftime('%H:%M')
-        else:
-            end_str = str(end_time)[:5] if end_time else 'N/A'
-        
-        type_emoji = "🔬" if lesson_type.lower() == 'lab' else "📖"
-        type_text = "Lab Session" if lesson_type.lower() == 'lab' else "Lecture"
-        
-        response = f"📍 Current Location: {batch_name}\n"
-        response += "─" * 50 + "\n\n"
-        response += f"🏫 **Room:** {classroom}\n"
-        response += f"{type_emoji} **Type:** {type_text}\n"
-        response += f"📚 **Subject:** {subject}\n"
-        response += f"👨‍🏫 **Teacher:** {teacher}\n"
-        response += f"⏰ **Time:** {start_str} – {end_str}\n"
-        
-        return response
+        return (f"📍 Current Location: {batch_name}\n"
+                f"{'─' * 50}\n\n"
+                f"🏫 **Room:** {classroom}\n"
+                f"{'🔬' if lab else '📖'} **Type:** {'Lab Session' if lab else 'Lecture'}\n"
+                f"📚 **Subject:** {subject}\n"
+                f"👨‍🏫 **Teacher:** {teacher}\n"
+                f"⏰ **Time:** {time_slot(start_time, end_time, ' – ')}\n")
 
 
 # ============================================================================
@@ -183,6 +190,10 @@ class WhereIsBatchFormatter(BaseFormatter):
 class RoomAvailabilityFormatter(BaseFormatter):
     """Format room availability results"""
     
+    def __init__(self, index: Optional[ClassroomIndex] = None):
+        # Defaults to the shared classroom_index (indexing all_rooms per call until it is loaded)
+        self.index = index
+    
     def format(self, all_rooms: List[Dict], occupied_rooms: List[str], context: Dict) -> str:
         """Format room availability"""
         time_info = context.get('time_info', {})
@@ -191,59 +202,51 @@ class RoomAvailabilityFormatter(BaseFormatter):
         day = time_info.get('day', 'Today')
         day_full = self._get_full_day_name(day)
         
-        # Filter available rooms
+        index = self.index or classroom_index
+        if not index.loaded:
+            index = ClassroomIndex()
+            index.load(all_rooms)
+        
+        # Split available rooms into labs and classrooms in one pass
         occupied_set = set(occupied_rooms)
-        available_rooms = [
-            room for room in all_rooms 
-            if room.get('classroom_id') not in occupied_set
-        ]
+        labs, classrooms = [], []
+        for room in all_rooms:
+            if room.get('classroom_id') in occupied_set:
+                continue
+            entry = index.entry(room)
+            (labs if entry['is_lab'] else classrooms).append(entry['classroom_name'])
+        available_count = len(labs) + len(classrooms)
         
         # Build header
         time_range = self._format_time_range(start_time, end_time)
-        header = f"🏫 Available Rooms – {day_full} {time_range}\n"
-        header += "─" * 75 + "\n\n"
-        
-        # Classify rooms by type
-        labs = [r for r in available_rooms if 'lab' in r.get('name', '').lower()]
-        classrooms = [r for r in available_rooms if 'lab' not in r.get('name', '').lower()]
+        lines = [f"🏫 Available Rooms – {day_full} {time_range}\n", "─" * 75 + "\n\n"]
         
         # Build available list
-        if available_rooms:
+        if available_count:
             if labs:
-                header += "🔬 **LABS AVAILABLE:**\n"
-                for room in labs:
-                    room_name = room.get('name', room.get('short', 'Unknown'))
-                    header += f"  ✅ {room_name}\n"
-                header += "\n"
+                lines.append("🔬 **LABS AVAILABLE:**\n" + bullet_lines(labs, "  ✅ ") + "\n")
             
             if classrooms:
-                header += "📚 **CLASSROOMS AVAILABLE:**\n"
-                for room in classrooms:
-                    room_name = room.get('name', room.get('short', 'Unknown'))
-                    header += f"  ✅ {room_name}\n"
-                header += "\n"
+                lines.append("📚 **CLASSROOMS AVAILABLE:**\n" + bullet_lines(classrooms, "  ✅ ") + "\n")
         else:
-            header += "⚠️  No rooms available during this time slot.\n\n"
+            lines.append("⚠️  No rooms available during this time slot.\n\n")
         
         # Build occupied list (first 5)
         if occupied_set:
-            header += "❌ **OCCUPIED:**\n"
+            lines.append("❌ **OCCUPIED:**\n")
             for room_id in list(occupied_set)[:5]:
-                room_info = next((r for r in all_rooms if r.get('classroom_id') == room_id), None)
-                if room_info:
-                    room_name = room_info.get('name', room_id)
-                    header += f"  🚫 {room_name}\n"
+                room_name = index.name(room_id)
+                if room_name:
+                    lines.append(f"  🚫 {room_name}\n")
             
             if len(occupied_set) > 5:
-                header += f"  ... and {len(occupied_set) - 5} more\n"
-            header += "\n"
+                lines.append(f"  ... and {len(occupied_set) - 5} more\n")
+            lines.append("\n")
         
         # Summary
-        total_rooms = len(all_rooms)
-        available_count = len(available_rooms)
-        header += f"📊 **Summary:** {available_count} available out of {total_rooms} total rooms\n"
+        lines.append(f"📊 **Summary:** {available_count} available out of {len(all_rooms)} total rooms\n")
         
-        return header
+        return "".join(lines)
     
     def _format_time_range(self, start_time: str, end_time: str) -> str:
         """Format time range"""
@@ -257,16 +260,7 @@ class RoomAvailabilityFormatter(BaseFormatter):
     
     def _get_full_day_name(self, day_code: str) -> str:
         """Convert day code to full name"""
-        day_map = {
-            'MON': 'Monday',
-            'TUE': 'Tuesday',
-            'WED': 'Wednesday',
-            'THU': 'Thursday',
-            'FRI': 'Friday',
-            'SAT': 'Saturday',
-            'SUN': 'Sunday',
-        }
-        return day_map.get(day_code, day_code)
+        return DAY_NAMES.get(day_code, day_code)
 
 
 # ============================================================================
@@ -290,7 +284,7 @@ User asked: "{user_message}"
 Context: {query_context}
 
 Database Results:
-{json.dumps(results[:10], indent=2, default=str)}
+{json.dumps([dict(row) for row in results[:10]], indent=2, default=str)}
 
 FORMATTING RULES:
 1. Start with a summary (e.g., "I found X matching Person(s):")
@@ -305,7 +299,7 @@ FORMATTING RULES:
 Formatted Response:"""
 
         try:
-            formatted_response = gemini_client.models.generate_content(
+            formatted_response = await gemini_client.aio.models.generate_content(
                 model="gemini-2.5-flash",
                 contents=format_prompt,
                 config=types.GenerateContentConfig(temperature=0.5, max_output_tokens=1024)
@@ -313,7 +307,7 @@ Formatted Response:"""
             return formatted_response.text.strip()
         except Exception as e:
             # Fallback to simple formatting
-            print(f"Formatting error: {e}")
+            logger.warning("Formatting error: %s", e)
             return self._simple_format(results, user_message)
     
     def _simple_format(self, results: List[Dict], query: str) -> str:
@@ -0,0 +1,226 @@
+# llm.py - Non-blocking Gemini access for the chat endpoints
+
+import asyncio
+import os
+from typing import AsyncIterator, Optional
+
+from google import genai
+from google.genai import types
+
+# LLM configuration
+LLM_CONFIG = {
+    "model": os.getenv("GEMINI_MODEL", "gemini-2.5-flash"),
+    "max_concurrency": int(os.getenv("LLM_MAX_CONCURRENCY", "8")),  # Gemini calls in flight at once
+    "timeout": float(os.getenv("LLM_TIMEOUT_SECONDS", "20")),  # Includes time spent waiting for a slot
+}
+
+# Initialize Gemini. GEMINI_BASE_URL points the client elsewhere, e.g. at
+# benchmarks/stub_gemini.py for offline load tests.
+client = genai.Client(
+    api_key=os.getenv("GEMINI_API_KEY", "__YOUR_API_KEY__"),
+    http_options=types.HttpOptions(base_url=os.getenv("GEMINI_BASE_URL")) if os.getenv("GEMINI_BASE_URL") else None,
+)
+
+# Created lazily so it binds to the running event loop
+_semaphore: Optional[asyncio.Semaphore] = None
+
+
+def _get_semaphore() -> asyncio.Semaphore:
+    global _semaphore
+    if _semaphore is None:
+        _semaphore = asyncio.Semaphore(LLM_CONFIG["max_concurrency"])
+    return _semaphore
+
+
+async def _bounded_generate(prompt: str, config: types.GenerateContentConfig):
+    async with _get_semaphore():
+        return await client.aio.models.generate_content(
+            model=LLM_CONFIG["model"],
+            contents=prompt,
+            config=config,
+        )
+
+
+async def generate_content(prompt: str, config: types.GenerateContentConfig, timeout: Optional[float] = None):
+    """
+    Call Gemini through the async client without blocking the event loop.
+
+    At most LLM_CONFIG["max_concurrency"] calls run at once; the rest wait for a
+    slot. Raises asyncio.TimeoutError when the call (including the wait) takes
+    longer than the timeout.
+    """
+    return await asyncio.wait_for(
+        _bounded_generate(prompt, config),
+        timeout=timeout if timeout is not None else LLM_CONFIG["timeout"],
+    )
+
+
+# ============================================================================
+# GENERAL QUERIES
+# ============================================================================
+
+GENERAL_PROMPT_TEMPLATE = """You are Ganpat University's assistant providing accurate information.
+
+        FACTS ABOUT GANPAT UNIVERSITY (GUNI):
+
+        BASIC INFORMATION:
+        - Full Name: Ganpat University (GUNI)
+        - Type: State Private University (not-for-profit, philanthropic)
+        - Location: North Gujarat, India
+        - Established: April 12, 2005 (through Gujarat State Legislature Act No. 19 of 2005)
+        - Recognition: University Grants Commission (UGC) recognized
+        - NAAC Grade: A Grade
+        - Campus: Over 300 acres in Ganpat Vidyanagar (high-tech education campus)
+        - Mission: "Social Upliftment through Education"
+
+        ADDRESS:
+        Ganpat University, Ganpat Vidyanagar, Mehsana-Gozaria Highway, North Gujarat, India, PIN - 384012
+
+        LEADERSHIP & MANAGEMENT:
+        - Patron-in-Chief & President: Padma Shri Dr. Ganpat Patel (Indian-American scientist, entrepreneur, philanthropist)
+        - Founded by: Large number of industrialists, technocrats, and businessmen
+        - Governed by: Board of Governors (as per university Act and rules/regulations)
+
+        COLLEGES & INSTITUTES:
+        - U. V. Patel College of Engineering (UVPCE)
+        - Shree S. K. Patel College of Pharmaceutical Education and Research
+        - V. M. Patel Institute of Management
+        - Acharya Motibhai Patel Institute of Computer Studies
+        - Faculties: Computer Technology, Management Studies & Research, Architecture, Nursing, Sciences, Social Science & Humanities, Maritime Studies, Agricultural Sciences, Polytechnic
+
+        PROGRAMS OFFERED:
+        Diploma, Undergraduate, Postgraduate, and Research programs across multiple disciplines
+
+        INDUSTRY COLLABORATIONS & CENTRES OF EXCELLENCE:
+        - Over 20 industry-supported Centres of Excellence
+        - Japan-India Institute for Manufacturing (JIM) - collaboration with Maruti Suzuki & Government of Japan
+        - Bosch-Rexroth for automation
+        - IBM for emerging technologies
+        - Recognized as Centre for Entrepreneurship Development (CED) nodal institute by Government of Gujarat
+        - Supports "Start-up India" initiative
+
+        FACILITIES & CAMPUS LIFE:
+        - Modern hostel facilities
+        - Sports tournaments and cultural programs
+        - Hosts academic conferences and workshops
+        - Vibrant student life with modern amenities
+
+        RULES FOR ANSWERING:
+        1. Answer directly in 1-5 sentences based on the question.
+        2. Use ONLY the facts above when answering about Ganpat University.
+        3. For non-university questions, give brief, helpful general answers.
+        4. Do NOT greet unless the user greets first.
+        5. Do NOT ask "How can I help?" or similar phrases.
+        6. Do NOT mention you are an AI or assistant.
+        7. Do NOT repeat the user's question.
+        8. Provide ONLY the final answer - clear and concise.
+
+        User's question: {user_message}
+
+        Answer:"""
+
+GENERAL_CONFIG = types.GenerateContentConfig(
+    temperature=0.2,  # Very low for consistent factual answers
+    max_output_tokens=350,
+    top_p=0.9,
+    top_k=40
+)
+
+# Clean up common AI phrases that might slip through
+UNWANTED_PHRASES = [
+    "As an AI", "I'm an AI", "As a language model",
+    "I am an assistant", "As an assistant",
+    "According to the information provided",
+    "Based on the facts above"
+]
+
+
+def clean_general_reply(text: str) -> str:
+    """Strip assistant boilerplate from a Gemini answer"""
+    reply = text.strip()
+    for phrase in UNWANTED_PHRASES:
+        reply = reply.replace(phrase, "").strip()
+
+    # Remove leading colons or dashes if present
+    return reply.lstrip(":- ").strip()
+
+
+async def answer_general_question(user_message: str) -> Optional[str]:
+    """
+    Answer a GENERAL query with Gemini.
+    Returns None when the model gives no usable answer.
+    """
+    prompt = GENERAL_PROMPT_TEMPLATE.format(user_message=user_message)
+    response = await generate_content(prompt, GENERAL_CONFIG)
+
+    if response and hasattr(response, "text") and response.text:
+        reply = clean_general_reply(response.text)
+        if reply:
+            return reply
+    return None
+
+
+# Trailing characters held back while streaming: a phrase may continue in the next chunk
+_HOLD_CHARS = max(len(p) for p in UNWANTED_PHRASES) - 1
+
+
+async def stream_general_answer(user_message: str) -> AsyncIterator[str]:
+    """
+    Stream a GENERAL answer from Gemini as text chunks.
+
+    UNWANTED_PHRASES are removed wherever they appear, as clean_general_reply
+    does: the last few characters are held back until the next chunk shows
+    whether they start a phrase. The LLM_TIMEOUT_SECONDS budget covers the
+    wait for a slot and the whole stream (asyncio.TimeoutError when exceeded).
+    """
+    prompt = GENERAL_PROMPT_TEMPLATE.format(user_message=user_message)
+    deadline = asyncio.get_running_loop().time() + LLM_CONFIG["timeout"]
+
+    semaphore = _get_semaphore()
+    acquired = False
+    iterator = None
+    try:
+        # Each await gets its own timeout_at(deadline): a timeout spanning the yields
+        # would fire into whatever the consumer is awaiting at the time
+        async with asyncio.timeout_at(deadline):
+            await semaphore.acquire()
+            acquired = True
+            stream = await client.aio.models.generate_content_stream(
+                model=LLM_CONFIG["model"],
+                contents=prompt,
+                config=GENERAL_CONFIG,
+            )
+        iterator = stream.__aiter__()
+        pending = ""
+        started = False
+        while True:
+            try:
+                async with asyncio.timeout_at(deadline):
+                    chunk = await iterator.__anext__()
+            except StopAsyncIteration:
+                break
+            text = getattr(chunk, "text", None)
+            if not text:
+                continue
+            pending += text
+            for phrase in UNWANTED_PHRASES:
+                pending = pending.replace(phrase, "")
+            if not started:
+                # Leading whitespace, colons or dashes, as clean_general_reply strips them
+                pending = pending.lstrip().lstrip(":- ").lstrip()
+            cut = len(pending) - _HOLD_CHARS
+            if cut > 0:
+                started = True
+                yield pending[:cut]
+                pending = pending[cut:]
+        if not started:
+            pending = pending.lstrip(":- ")
+        pending = pending.rstrip()
+        if pending:
+            yield pending
+    finally:
+        # Ends the upstream request too when the client went away or the deadline passed
+        if iterator is not None and hasattr(iterator, "aclose"):
+            await iterator.aclose()
+        if acquired:
+            semaphore.release()
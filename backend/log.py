@@ -0,0 +1,135 @@
+# log.py - JSON-lines logging off the request path
+#
+# Records are put on a bounded in-memory queue by a QueueHandler and written
+# to stdout by a QueueListener thread, so a log call on the event loop never
+# waits on the terminal/pipe. Below-WARNING records can be sampled, and every
+# record carries the request_id of the /chat call that produced it.
+
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Optional
+
+LOG_CONFIG = {
+    "level": os.getenv("LOG_LEVEL", "INFO").upper(),
+    # Fraction of DEBUG/INFO records kept; WARNING and above are never sampled
+    "sample_rate": float(os.getenv("LOG_SAMPLE_RATE", "1.0")),
+    # Records queued for the writer thread; further records are dropped, not waited on
+    "queue_size": int(os.getenv("LOG_QUEUE_SIZE", "10000")),
+}
+
+request_id_var: ContextVar[str] = ContextVar("request_id", default="-")
+
+# Attributes every LogRecord has; anything else came in through extra={...}
+_RECORD_ATTRS = frozenset(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def new_request_id(incoming: Optional[str] = None) -> str:
+    """Bind a request id (the caller's X-Request-ID if given) to the current task"""
+    request_id = incoming or uuid.uuid4().hex[:16]
+    request_id_var.set(request_id)
+    return request_id
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record: ts, level, logger, request_id, msg and any extra fields"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "request_id": getattr(record, "request_id", "-"),
+            "msg": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and key != "request_id":
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class _ContextFilter(logging.Filter):
+    """Sample low-severity records and stamp request_id while still on the caller's task"""
+
+    def __init__(self, sample_rate: float):
+        super().__init__()
+        self.sample_rate = sample_rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno < logging.WARNING and self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            return False
+        record.request_id = request_id_var.get()
+        return True
+
+
+class _DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that drops records when the queue is full instead of raising"""
+
+    dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Resolve args/traceback now (they may not survive to the writer thread),
+        # but leave JSON encoding to the writer
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            _DroppingQueueHandler.dropped += 1
+
+
+def setup_logging():
+    """Route the root logger through the queue; safe to call more than once"""
+    global _listener
+    if _listener is not None:
+        return
+
+    log_queue: queue.Queue = queue.Queue(LOG_CONFIG["queue_size"])
+    stream = logging.StreamHandler(sys.stdout)
+    stream.setFormatter(JsonFormatter())
+
+    handler = _DroppingQueueHandler(log_queue)
+    handler.addFilter(_ContextFilter(LOG_CONFIG["sample_rate"]))
+
+    root = logging.getLogger()
+    root.handlers[:] = [handler]
+    root.setLevel(LOG_CONFIG["level"])
+
+    _listener = logging.handlers.QueueListener(log_queue, stream, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging():
+    """Flush queued records and stop the writer thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def dropped_records() -> int:
+    """Records discarded because the queue was full"""
+    return _DroppingQueueHandler.dropped
@@ -1,23 +1,43 @@
 # main.py - COMPLETE FIXED VERSION with hardcoded SQL for all queries
 
 from fastapi import FastAPI, Request
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
-from google import genai
-from google.genai import types
-from db import fetch_query_async, get_pool
-import json
+from db import fetch_query_async, get_pool, pool_stats, coalesce_stats, prepare_on_connect, DB_CONFIG
+from llm import answer_general_question, stream_general_answer, clean_general_reply
+from name_search import (
+    normalize_name, build_student_name_search_sql, build_teacher_name_search_sql, merge_name_matches,
+)
+from migrate import apply_migrations
+from cache import TTLCache
+from schedule import (
+    refresh_batch_schedule, on_refresh, start_background_jobs, stop_background_jobs,
+    schedule_index, current_day_code,
+)
+from room_occupancy import room_occupancy
+from classroom_index import classroom_index
+from faculty_directory import faculty_directory, load_faculty_directory
+from answer_cache import answer_cache
+from formatters import DAY_NAMES, bullet_lines, time_slot, is_lab
+from metrics import RequestTimer
+import metrics
+from log import setup_logging, new_request_id, dropped_records
+from responses import FastJSONResponse, dumps
+import logging
 import re
 import os
-from typing import Dict, Optional
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from datetime import datetime, time
+from time import perf_counter
 import asyncio
 
-from schema_context import get_day_binary
-from query_router import detect_query_type, QueryType, build_query_context
+from schema_context import get_day_binary, DAY_TO_BINARY, BINARY_TO_DAY
+from query_router import classify, QueryType
 
-# Initialize Gemini
-client = genai.Client(api_key=os.getenv("GEMINI_API_KEY", "__YOUR_API_KEY__"))
+setup_logging()
+logger = logging.getLogger(__name__)
 
-app = FastAPI(title="Ganpat University AI Chatbot")
+app = FastAPI(title="Ganpat University AI Chatbot", default_response_class=FastJSONResponse)
 
 app.add_middleware(
     CORSMiddleware,
@@ -32,19 +52,7 @@ app.add_middleware(
 # HARDCODED SQL BUILDERS
 # ============================================================================
 
-def build_person_lookup_sql(person_info: Dict) -> Optional[str]:
-    """Build SQL for person lookup - CASE INSENSITIVE"""
-    id_type = person_info.get('type')
-    id_value = person_info.get('value')
-    
-    if not id_type or not id_value:
-        return None
-    
-    # Clean the value
-    id_value_clean = id_value.strip()
-    
-    if id_type == 'student_enrollment':
-        return f"""
+STUDENT_DETAILS_SELECT = """
 SELECT 
     'student' as person_type,
     enrollment_no,
@@ -58,13 +66,28 @@ SELECT
     gender,
     hosteller_commuters,
     batch
-FROM student_enrollment_information
-WHERE enrollment_no = '{id_value_clean}'
+FROM student_enrollment_information"""
+
+
+def build_person_lookup_sql(person_info: Dict) -> Optional[Tuple[str, tuple]]:
+    """Build SQL + params for person lookup - CASE INSENSITIVE"""
+    id_type = person_info.get('type')
+    id_value = person_info.get('value')
+    
+    if not id_type or not id_value:
+        return None
+    
+    # Clean the value
+    id_value_clean = id_value.strip()
+    
+    if id_type == 'student_enrollment':
+        return STUDENT_DETAILS_SELECT + """
+WHERE enrollment_no = $1
 LIMIT 1;
-"""
+""", (id_value_clean,)
     
     elif id_type == 'teacher_id':
-        return f"""
+        return """
 SELECT 
     'teacher' as person_type,
     user_id as employee_id,
@@ -72,12 +95,12 @@ SELECT
     email_id as email,
     short
 FROM teacher_enrollment_info
-WHERE user_id = '{id_value_clean}'
+WHERE user_id = $1
 LIMIT 1;
-"""
+""", (id_value_clean,)
     
     elif id_type == 'phone':
-        return f"""
+        return """
 SELECT 
     'student' as person_type,
     enrollment_no,
@@ -89,13 +112,13 @@ SELECT
     parents_phone_no as parent_phone,
     student_gnu_mail_id as email
 FROM student_enrollment_information
-WHERE student_phone_no = '{id_value_clean}'
-   OR parents_phone_no = '{id_value_clean}'
+WHERE student_phone_no = $1
+   OR parents_phone_no = $1
 LIMIT 10;
-"""
+""", (id_value_clean,)
     
     elif id_type == 'email':
-        return f"""
+        return """
 SELECT 
     'student' as person_type,
     enrollment_no,
@@ -104,155 +127,119 @@ SELECT
     parents_phone_no as parent_phone,
     student_gnu_mail_id as email
 FROM student_enrollment_information
-WHERE LOWER(student_gnu_mail_id) LIKE LOWER('%{id_value_clean}%')
-   OR LOWER(student_personal_mail_id) LIKE LOWER('%{id_value_clean}%')
+WHERE LOWER(student_gnu_mail_id) = LOWER($1)
+   OR LOWER(student_personal_mail_id) = LOWER($1)
 LIMIT 10;
-"""
+""", (id_value_clean,)
     
     elif id_type == 'name':
-        # CASE INSENSITIVE name search
-        name_lower = id_value_clean.lower()
-        name_parts = name_lower.split()
-        
-        if len(name_parts) == 1:
-            # Single name - search anywhere in name
-            return f"""
-SELECT 
-    'student' as person_type,
-    enrollment_no,
-    name_of_student as name,
-    branch,
-    semester,
-    class,
-    student_phone_no as phone,
-    parents_phone_no as parent_phone,
-    student_gnu_mail_id as email,
-    gender
-FROM student_enrollment_information
-WHERE LOWER(name_of_student) LIKE LOWER('%{name_parts[0]}%')
-ORDER BY name_of_student
-LIMIT 10;
-"""
-        else:
-            # Multiple words - try exact match first, then partial
-            full_name = ' '.join(name_parts)
-            first_name = name_parts[0]
-            last_name = name_parts[-1]
-            return f"""
-SELECT 
-    'student' as person_type,
-    enrollment_no,
-    name_of_student as name,
-    branch,
-    semester,
-    class,
-    student_phone_no as phone,
-    parents_phone_no as parent_phone,
-    student_gnu_mail_id as email,
-    gender
-FROM student_enrollment_information
-WHERE LOWER(name_of_student) LIKE LOWER('%{full_name}%')
-   OR (LOWER(name_of_student) LIKE LOWER('%{first_name}%') 
-       AND LOWER(name_of_student) LIKE LOWER('%{last_name}%'))
-ORDER BY 
-    CASE WHEN LOWER(name_of_student) LIKE LOWER('%{full_name}%') THEN 0 ELSE 1 END,
-    name_of_student
-LIMIT 10;
-"""
+        # Ranked, typo-tolerant trigram search (see name_search.py)
+        if not normalize_name(id_value_clean):
+            return None
+        return build_student_name_search_sql(id_value_clean)
     
     return None
 
 
-def build_teacher_search_sql(name: str) -> str:
-    """Build SQL to search teachers"""
-    name_lower = name.lower().strip()
-    return f"""
-SELECT 
-    'teacher' as person_type,
-    user_id as employee_id,
-    tt_display_full_name as name,
-    email_id as email,
-    short
-FROM teacher_enrollment_info
-WHERE LOWER(tt_display_full_name) LIKE LOWER('%{name_lower}%')
-ORDER BY tt_display_full_name
-LIMIT 10;
-"""
+def build_teacher_search_sql(name: str) -> Tuple[str, tuple]:
+    """Build SQL + params to search teachers"""
+    return build_teacher_name_search_sql(name)
 
 
-def build_batch_timetable_sql(batch_name: str, day_binary: str) -> str:
+def build_batch_timetable_sql(batch_name: str, day_binary: str) -> Tuple[str, tuple]:
     """
-    Build SQL for batch timetable - EXACT pattern from Query_explanation.txt
+    Build SQL + params for batch timetable - reads the batch_schedule view (schedule.py)
     """
-    return f"""
+    return """
 SELECT 
-    b.name AS batch_name,
-    s.name AS subject_name,
-    l.lesson_type,
-    c.period,
-    c.days,
-    cr.name AS classroom_name,
-    p.start_time,
-    p.end_time
-FROM batch b
-JOIN "group" g ON g.class_id = b.class_id
-JOIN lesson l ON g.group_id::text = ANY(
-    string_to_array(trim(both '{{}}' from l.group_ids), ',')
-)
-JOIN card c ON c.lesson_id = l.lesson_id
-JOIN subject s ON s.subject_id = l.subject_id
-JOIN classroom cr ON cr.classroom_id = ANY(
-    string_to_array(trim(both '{{}}' from l.classroom_ids), ',')
-)
-JOIN periods p ON p.period = c.period
-WHERE b.name = '{batch_name}'
-  AND c.days = '{day_binary}'
-ORDER BY p.start_time;
-"""
+    batch_name,
+    subject AS subject_name,
+    lesson_type,
+    period,
+    day_code AS days,
+    classroom AS classroom_name,
+    start_time,
+    end_time
+FROM batch_schedule
+WHERE batch_name = $1
+  AND day_code = $2
+ORDER BY start_time;
+""", (batch_name, day_binary)
+
+
+def build_week_timetable_sql(batch_name: str) -> Tuple[str, tuple]:
+    """Build SQL + params for every day of a batch's timetable in one query"""
+    return """
+SELECT 
+    batch_name,
+    subject AS subject_name,
+    lesson_type,
+    period,
+    day_code AS days,
+    classroom AS classroom_name,
+    start_time,
+    end_time
+FROM batch_schedule
+WHERE batch_name = $1
+ORDER BY day_code DESC, start_time;
+""", (batch_name,)
+
+
+def build_enrollments_lookup_sql(enrollment_nos: List[str]) -> Tuple[str, tuple]:
+    """Build SQL + params for several enrollment numbers in one query (/chat/batch)"""
+    return STUDENT_DETAILS_SELECT + """
+WHERE enrollment_no = ANY($1::text[]);
+""", (enrollment_nos,)
+
+
+def build_batch_timetables_sql(keys: List[Tuple[str, str]]) -> Tuple[str, tuple]:
+    """Build SQL + params for several (batch_name, day_binary) timetables in one query"""
+    return """
+SELECT 
+    s.batch_name,
+    s.subject AS subject_name,
+    s.lesson_type,
+    s.period,
+    s.day_code AS days,
+    s.classroom AS classroom_name,
+    s.start_time,
+    s.end_time
+FROM batch_schedule s
+JOIN unnest($1::text[], $2::text[]) AS k(batch_name, day_code)
+  ON s.batch_name = k.batch_name AND s.day_code = k.day_code
+ORDER BY s.batch_name, s.day_code, s.start_time;
+""", ([batch for batch, _ in keys], [day for _, day in keys])
 
 
-def build_where_is_batch_sql(batch_name: str) -> str:
+def build_where_is_batch_sql(batch_name: str) -> Tuple[str, tuple]:
     """
-    Build SQL for "where is batch right now" - EXACT pattern from Query_explanation.txt
+    Build SQL + params for "where is batch right now" - reads the batch_schedule view
     """
-    return f"""
-WITH today_binary AS (
-    SELECT CASE 
-        WHEN TO_CHAR(CURRENT_DATE, 'Day') ILIKE 'Monday%' THEN '100000'
-        WHEN TO_CHAR(CURRENT_DATE, 'Day') ILIKE 'Tuesday%' THEN '010000'
-        WHEN TO_CHAR(CURRENT_DATE, 'Day') ILIKE 'Wednesday%' THEN '001000'
-        WHEN TO_CHAR(CURRENT_DATE, 'Day') ILIKE 'Thursday%' THEN '000100'
-        WHEN TO_CHAR(CURRENT_DATE, 'Day') ILIKE 'Friday%' THEN '000010'
-        WHEN TO_CHAR(CURRENT_DATE, 'Day') ILIKE 'Saturday%' THEN '000001'
-    END AS day_code
-)
+    return """
 SELECT 
-    b.name AS batch_name,
-    s.name AS subject_name,
-    l.lesson_type,
-    c.period,
-    c.days AS day_binary,
-    cr.name AS classroom_name,
-    p.start_time,
-    p.end_time
-FROM batch b
-JOIN "group" g ON g.class_id = b.class_id
-JOIN lesson l ON g.group_id::text = ANY(
-    string_to_array(trim(both '{{}}' from l.group_ids), ',')
-)
-JOIN card c ON c.lesson_id = l.lesson_id
-JOIN today_binary tb ON c.days = tb.day_code
-JOIN subject s ON s.subject_id = l.subject_id
-JOIN classroom cr ON cr.classroom_id = ANY(
-    string_to_array(trim(both '{{}}' from l.classroom_ids), ',')
-)
-JOIN periods p ON p.period = c.period
-WHERE b.name = '{batch_name}'
-  AND CURRENT_TIME BETWEEN p.start_time AND p.end_time;
-"""
+    batch_name,
+    subject AS subject_name,
+    lesson_type,
+    period,
+    day_code AS day_binary,
+    classroom AS classroom_name,
+    start_time,
+    end_time
+FROM batch_schedule
+WHERE batch_name = $1
+  AND day_code = CASE EXTRACT(ISODOW FROM CURRENT_DATE)
+        WHEN 1 THEN '100000'
+        WHEN 2 THEN '010000'
+        WHEN 3 THEN '001000'
+        WHEN 4 THEN '000100'
+        WHEN 5 THEN '000010'
+        WHEN 6 THEN '000001'
+    END
+  AND CURRENT_TIME BETWEEN start_time AND end_time;
+""", (batch_name,)
 
 
-def build_free_rooms_now_sql() -> str:
+def build_free_rooms_now_sql() -> Tuple[str, tuple]:
     """Build SQL for free rooms right now - EXACT pattern from Query_explanation.txt"""
     return """
 SELECT 
@@ -264,12 +251,12 @@ WHERE c.classroom_id NOT IN (
     FROM session s
     WHERE CURRENT_TIME BETWEEN s.start_time::time AND s.end_time::time
 );
-"""
+""", ()
 
 
-def build_free_rooms_time_sql(start_time: str, end_time: str) -> str:
-    """Build SQL for free rooms in time range - EXACT pattern from Query_explanation.txt"""
-    return f"""
+def build_free_rooms_time_sql(start_time: str, end_time: str) -> Tuple[str, tuple]:
+    """Build SQL + params for free rooms in time range - EXACT pattern from Query_explanation.txt"""
+    return """
 SELECT 
     c.classroom_id,
     c.name AS classroom_name
@@ -277,10 +264,146 @@ FROM classroom c
 WHERE c.classroom_id NOT IN (
     SELECT s.classroom_id
     FROM session s
-    WHERE s.start_time::time < '{end_time}'::time
-      AND s.end_time::time > '{start_time}'::time
+    WHERE s.start_time::time < $2
+      AND s.end_time::time > $1
 );
-"""
+""", (parse_sql_time(start_time), parse_sql_time(end_time))
+
+
+def parse_sql_time(value: str) -> time:
+    """Convert an 'HH:MM:SS' string into a time parameter (asyncpg needs datetime.time)"""
+    return datetime.strptime(value, "%H:%M:%S").time()
+
+
+def parse_clock(value: str) -> time:
+    """Parse 'HH:MM' or 'HH:MM:SS'"""
+    value = value.strip()
+    return datetime.strptime(value, "%H:%M:%S" if value.count(':') == 2 else "%H:%M").time()
+
+
+def parse_slot(value: str) -> Tuple[time, time]:
+    """Parse 'HH:MM-HH:MM' into (start, end)"""
+    parts = value.split('-')
+    if len(parts) != 2:
+        raise ValueError(f"slot {value.strip()!r} is not START-END")
+    return parse_clock(parts[0]), parse_clock(parts[1])
+
+
+# Prepared on every new pooled connection (db.prepare_on_connect); '-' matches no rows
+prepare_on_connect(
+    build_person_lookup_sql({'type': 'student_enrollment', 'value': '-'}),
+    build_person_lookup_sql({'type': 'phone', 'value': '-'}),
+    build_person_lookup_sql({'type': 'email', 'value': '-'}),
+    build_batch_timetable_sql('-', '-'),
+    build_week_timetable_sql('-'),
+)
+
+
+# ============================================================================
+# TIMETABLE CACHE
+# ============================================================================
+
+# (batch_name, day_binary) -> timetable rows. Timetables change only a few times
+# a semester; call POST /admin/cache/timetable/invalidate after editing them.
+timetable_cache = TTLCache(
+    max_entries=int(os.getenv("TIMETABLE_CACHE_MAX_ENTRIES", "2048")),
+    ttl=float(os.getenv("TIMETABLE_CACHE_TTL_SECONDS", "3600")),
+    max_bytes=int(os.getenv("TIMETABLE_CACHE_MAX_BYTES", str(32 * 1024 * 1024))),
+)
+
+
+async def fetch_batch_timetable(batch_name: str, day_binary: str) -> list:
+    """Timetable rows for a batch/day, served from timetable_cache when possible"""
+    key = (batch_name, day_binary)
+    results = timetable_cache.get(key)
+    if results is None:
+        sql, params = build_batch_timetable_sql(batch_name, day_binary)
+        results = await fetch_query_async(sql, params)
+        timetable_cache.set(key, results)
+    return results
+
+
+async def fetch_batch_timetables(keys: List[Tuple[str, str]]) -> Dict[Tuple[str, str], list]:
+    """Timetable rows for several (batch_name, day_binary) keys; cache misses share one query"""
+    found = {}
+    missing = []
+    for key in dict.fromkeys(keys):
+        results = timetable_cache.get(key)
+        if results is None:
+            missing.append(key)
+        else:
+            found[key] = results
+
+    if missing:
+        sql, params = build_batch_timetables_sql(missing)
+        fetched = {key: [] for key in missing}
+        for row in await fetch_query_async(sql, params):
+            fetched[(row['batch_name'], row['days'])].append(row)
+        for key, results in fetched.items():
+            timetable_cache.set(key, results)
+        found.update(fetched)
+    return found
+
+
+async def fetch_week_timetable(batch_name: str) -> Dict[str, list]:
+    """
+    Timetable rows for every weekday of a batch, keyed by day_binary (Monday first).
+    Shares timetable_cache entries with fetch_batch_timetable; any miss refetches the
+    whole week in one query and caches each day, including days without classes.
+    """
+    week = {day_binary: timetable_cache.get((batch_name, day_binary)) for day_binary in BINARY_TO_DAY}
+    if all(results is not None for results in week.values()):
+        return week
+
+    sql, params = build_week_timetable_sql(batch_name)
+    week = {day_binary: [] for day_binary in BINARY_TO_DAY}
+    for row in await fetch_query_async(sql, params):
+        if row['days'] in week:
+            week[row['days']].append(row)
+    for day_binary, results in week.items():
+        timetable_cache.set((batch_name, day_binary), results)
+    return week
+
+
+@on_refresh
+def _clear_timetable_cache():
+    timetable_cache.clear()
+
+
+# ============================================================================
+# PERSON CACHE
+# ============================================================================
+
+# Identifiers matched exactly (and indexed, migrations/0003); name searches are not cached
+EXACT_ID_TYPES = ('student_enrollment', 'teacher_id', 'phone', 'email')
+
+# (id_type, value) -> person rows, for the hot enrollment/phone/email lookups.
+# Student records rarely change; POST /admin/cache/person/invalidate after editing one.
+person_cache = TTLCache(
+    max_entries=int(os.getenv("PERSON_CACHE_MAX_ENTRIES", "5000")),
+    ttl=float(os.getenv("PERSON_CACHE_TTL_SECONDS", "900")),
+    max_bytes=int(os.getenv("PERSON_CACHE_MAX_BYTES", str(16 * 1024 * 1024))),
+)
+
+
+def person_cache_key(person_info: Dict) -> Optional[Tuple[str, str]]:
+    """Cache key for an exact identifier lookup; None for name searches"""
+    id_type = person_info.get('type')
+    if id_type not in EXACT_ID_TYPES or not person_info.get('value'):
+        return None
+    return (id_type, person_info['value'].strip().lower())
+
+
+async def fetch_person(person_info: Dict, sql: str, params: tuple) -> list:
+    """Rows for an exact identifier lookup, served from person_cache when possible"""
+    key = person_cache_key(person_info)
+    results = person_cache.get(key) if key else None
+    if results is None:
+        results = await fetch_query_async(sql, params)
+        # Misses are not cached so that newly added students show up at once
+        if key and results:
+            person_cache.set(key, results)
+    return results
 
 
 # ============================================================================
@@ -362,50 +485,76 @@ def format_teacher_response(results: list) -> str:
         return response
 
 
+def format_person_response(results: list) -> str:
+    """Format person lookup results; students and teachers may be mixed after a name search"""
+    person_types = {r.get('person_type') for r in results}
+    if person_types == {'teacher'}:
+        return format_teacher_response(results)
+    if person_types != {'student', 'teacher'}:
+        return format_student_response(results)
+    
+    response = f"I found **{len(results)} people** matching your query:\n\n"
+    for i, p in enumerate(results[:5], 1):
+        name = p.get('name', 'Unknown')
+        if p.get('person_type') == 'teacher':
+            response += f"{i}. **{name}** - Teacher (ID: {p.get('employee_id', 'N/A')})\n"
+        else:
+            response += f"{i}. **{name}** - {p.get('enrollment_no', 'N/A')} ({p.get('class', 'N/A')})\n"
+    
+    if len(results) > 5:
+        response += f"\n...and {len(results) - 5} more. Please be more specific."
+    
+    return response
+
+
 def format_timetable_response(results: list, context: Dict) -> str:
     """Format timetable in structured but readable format"""
+    return "".join(timetable_response_chunks(results, context))
+
+
+def timetable_response_chunks(results: list, context: Dict) -> List[str]:
+    """format_timetable_response as a header chunk followed by one chunk per period (for /chat/stream)"""
     if not results:
         batch_name = context.get('class_batch_name', 'this batch')
         day = context.get('day', 'today')
-        return f"📅 No classes scheduled for **{batch_name}** on **{day}**.\n\nPlease check the batch name format (e.g., 7CE-A-2) and day."
+        return [f"📅 No classes scheduled for **{batch_name}** on **{day}**.\n\nPlease check the batch name format (e.g., 7CE-A-2) and day."]
     
     batch_name = context.get('class_batch_name', results[0].get('batch_name', 'Unknown'))
     day = context.get('day', 'Today')
+    day_full = DAY_NAMES.get(day, day)
     
-    # Day name mapping
-    day_names = {'MON': 'Monday', 'TUE': 'Tuesday', 'WED': 'Wednesday', 
-                 'THU': 'Thursday', 'FRI': 'Friday', 'SAT': 'Saturday'}
-    day_full = day_names.get(day, day)
-    
-    response = f"📚 **Timetable for {batch_name}** ({day_full})\n"
-    response += "━" * 40 + "\n\n"
-    
+    chunks = [f"📚 **Timetable for {batch_name}** ({day_full})\n" + "━" * 40 + "\n\n"]
     for i, entry in enumerate(results, 1):
-        start = entry.get('start_time')
-        end = entry.get('end_time')
-        subject = entry.get('subject_name', 'N/A')
-        classroom = entry.get('classroom_name', 'N/A')
-        lesson_type = entry.get('lesson_type', 'lecture')
-        
-        # Format time
-        if hasattr(start, 'strftime'):
-            start_str = start.strftime('%H:%M')
-        else:
-            start_str = str(start)[:5] if start else 'N/A'
-        
-        if hasattr(end, 'strftime'):
-            end_str = end.strftime('%H:%M')
-        else:
-            end_str = str(end)[:5] if end else 'N/A'
-        
-        type_emoji = "🔬" if 'lab' in str(lesson_type).lower() else "📖"
-        type_text = "Lab" if 'lab' in str(lesson_type).lower() else "Lecture"
-        
-        response += f"**{i}. {start_str} - {end_str}**\n"
-        response += f"   {type_emoji} {subject}\n"
-        response += f"   🏫 {classroom} ({type_text})\n\n"
+        lab = is_lab(entry.get('lesson_type', 'lecture'))
+        chunks.append(f"**{i}. {time_slot(entry.get('start_time'), entry.get('end_time'))}**\n"
+                      f"   {'🔬' if lab else '📖'} {entry.get('subject_name', 'N/A')}\n"
+                      f"   🏫 {entry.get('classroom_name', 'N/A')} ({'Lab' if lab else 'Lecture'})\n\n")
+    return chunks
+
+
+def format_week_timetable_response(week: Dict[str, list], batch_name: str) -> str:
+    """Format a whole week (fetch_week_timetable) as one reply"""
+    return "".join(week_timetable_response_chunks(week, batch_name))
+
+
+def week_timetable_response_chunks(week: Dict[str, list], batch_name: str) -> List[str]:
+    """format_week_timetable_response as a header chunk followed by one chunk per day (for /chat/stream)"""
+    if not any(week.values()):
+        return [f"📅 No classes scheduled for **{batch_name}** this week.\n\nPlease check the batch name format (e.g., 7CE-A-2)."]
     
-    return response
+    chunks = [f"🗓️ **Weekly Timetable for {batch_name}**\n" + "━" * 40 + "\n\n"]
+    for day_binary, results in week.items():
+        lines = [f"**{BINARY_TO_DAY[day_binary]}**\n"]
+        for entry in results:
+            lab = is_lab(entry.get('lesson_type', 'lecture'))
+            lines.append(f"   {time_slot(entry.get('start_time'), entry.get('end_time'))}  "
+                         f"{'🔬' if lab else '📖'} {entry.get('subject_name', 'N/A')} "
+                         f"({entry.get('classroom_name', 'N/A')})\n")
+        if not results:
+            lines.append("   No classes\n")
+        lines.append("\n")
+        chunks.append("".join(lines))
+    return chunks
 
 
 def format_where_is_batch_response(results: list, context: Dict) -> str:
@@ -420,58 +569,36 @@ def format_where_is_batch_response(results: list, context: Dict) -> str:
                f"• It's outside college hours"
     
     entry = results[0]
-    subject = entry.get('subject_name', 'N/A')
-    classroom = entry.get('classroom_name', 'N/A')
-    lesson_type = entry.get('lesson_type', 'lecture')
-    start = entry.get('start_time')
-    end = entry.get('end_time')
-    
-    if hasattr(start, 'strftime'):
-        start_str = start.strftime('%H:%M')
-    else:
-        start_str = str(start)[:5] if start else 'N/A'
-    
-    if hasattr(end, 'strftime'):
-        end_str = end.strftime('%H:%M')
-    else:
-        end_str = str(end)[:5] if end else 'N/A'
-    
-    type_text = "Lab" if 'lab' in str(lesson_type).lower() else "Lecture"
-    type_emoji = "🔬" if 'lab' in str(lesson_type).lower() else "📖"
-    
-    response = f"📍 **{batch_name}** is currently in:\n\n"
-    response += f"🏫 **Room:** {classroom}\n"
-    response += f"{type_emoji} **Subject:** {subject}\n"
-    response += f"📋 **Type:** {type_text}\n"
-    response += f"⏰ **Time:** {start_str} - {end_str}\n"
+    lab = is_lab(entry.get('lesson_type', 'lecture'))
     
-    return response
+    return (f"📍 **{batch_name}** is currently in:\n\n"
+            f"🏫 **Room:** {entry.get('classroom_name', 'N/A')}\n"
+            f"{'🔬' if lab else '📖'} **Subject:** {entry.get('subject_name', 'N/A')}\n"
+            f"📋 **Type:** {'Lab' if lab else 'Lecture'}\n"
+            f"⏰ **Time:** {time_slot(entry.get('start_time'), entry.get('end_time'))}\n")
 
 
 def format_free_rooms_response(results: list) -> str:
     """Format free rooms list"""
+    return "".join(free_rooms_response_chunks(results))
+
+
+def free_rooms_response_chunks(results: list) -> List[str]:
+    """format_free_rooms_response as a header chunk followed by the labs and classrooms sections (for /chat/stream)"""
     if not results:
-        return "🏫 No rooms are available at this time. All rooms are currently occupied."
+        return ["🏫 No rooms are available at this time. All rooms are currently occupied."]
     
-    # Separate labs and classrooms
-    labs = [r for r in results if 'lab' in r.get('classroom_name', '').lower()]
-    classrooms = [r for r in results if 'lab' not in r.get('classroom_name', '').lower()]
-    
-    response = f"🏫 **Available Rooms** ({len(results)} total)\n"
-    response += "━" * 35 + "\n\n"
+    # Separate labs and classrooms by the type precomputed in classroom_index
+    labs, classrooms = [], []
+    for room in results:
+        (labs if classroom_index.is_lab(room) else classrooms).append(room.get('classroom_name', 'Unknown'))
     
+    chunks = [f"🏫 **Available Rooms** ({len(results)} total)\n" + "━" * 35 + "\n\n"]
     if labs:
-        response += "🔬 **Labs:**\n"
-        for room in labs:
-            response += f"   ✅ {room.get('classroom_name', 'Unknown')}\n"
-        response += "\n"
-    
+        chunks.append("🔬 **Labs:**\n" + bullet_lines(labs, "   ✅ ") + "\n")
     if classrooms:
-        response += "📚 **Classrooms:**\n"
-        for room in classrooms:
-            response += f"   ✅ {room.get('classroom_name', 'Unknown')}\n"
-    
-    return response
+        chunks.append("📚 **Classrooms:**\n" + bullet_lines(classrooms, "   ✅ "))
+    return chunks
 
 
 # ============================================================================
@@ -481,238 +608,526 @@ def format_free_rooms_response(results: list) -> str:
 @app.post("/chat")
 async def chat(request: Request):
     """Main chat endpoint with hardcoded SQL"""
+    headers = {"X-Request-ID": new_request_id(request.headers.get("x-request-id"))}
+    timer = RequestTimer()
     try:
         data = await request.json()
         user_message = data.get("message", "").strip()
 
         if not user_message:
-            return {"reply": "Please send a message."}
+            return FastJSONResponse({"reply": "Please send a message."}, headers=headers)
 
-        detected_type = detect_query_type(user_message)
-        print(f"🔍 Detected: {detected_type}")
+        return FastJSONResponse(await answer_message(user_message, timer), headers=headers)
 
-        context = build_query_context(user_message, detected_type)
-        print(f"📋 Context: {context}")
+    except Exception as e:
+        logger.exception("Chat request failed")
+        return FastJSONResponse({"reply": "Something went wrong. Please try again.", "error": str(e)}, headers=headers)
+    finally:
+        timer.finish()
 
-        # === GREETING ===
-        if detected_type == QueryType.GREETING:
-            return {"reply": "Hello! 👋 I'm your Ganpat University assistant.\n\nI can help you with:\n• Student/Teacher information\n• Batch timetables\n• Room availability\n\nWhat would you like to know?"}
 
-        # === GENERAL QUERY ===
-        if detected_type == QueryType.GENERAL:
-            try:
-                prompt = f"""You are Ganpat University's assistant providing accurate information.
-
-        FACTS ABOUT GANPAT UNIVERSITY (GUNI):
-
-        BASIC INFORMATION:
-        - Full Name: Ganpat University (GUNI)
-        - Type: State Private University (not-for-profit, philanthropic)
-        - Location: North Gujarat, India
-        - Established: April 12, 2005 (through Gujarat State Legislature Act No. 19 of 2005)
-        - Recognition: University Grants Commission (UGC) recognized
-        - NAAC Grade: A Grade
-        - Campus: Over 300 acres in Ganpat Vidyanagar (high-tech education campus)
-        - Mission: "Social Upliftment through Education"
-
-        ADDRESS:
-        Ganpat University, Ganpat Vidyanagar, Mehsana-Gozaria Highway, North Gujarat, India, PIN - 384012
-
-        LEADERSHIP & MANAGEMENT:
-        - Patron-in-Chief & President: Padma Shri Dr. Ganpat Patel (Indian-American scientist, entrepreneur, philanthropist)
-        - Founded by: Large number of industrialists, technocrats, and businessmen
-        - Governed by: Board of Governors (as per university Act and rules/regulations)
-
-        COLLEGES & INSTITUTES:
-        - U. V. Patel College of Engineering (UVPCE)
-        - Shree S. K. Patel College of Pharmaceutical Education and Research
-        - V. M. Patel Institute of Management
-        - Acharya Motibhai Patel Institute of Computer Studies
-        - Faculties: Computer Technology, Management Studies & Research, Architecture, Nursing, Sciences, Social Science & Humanities, Maritime Studies, Agricultural Sciences, Polytechnic
-
-        PROGRAMS OFFERED:
-        Diploma, Undergraduate, Postgraduate, and Research programs across multiple disciplines
-
-        INDUSTRY COLLABORATIONS & CENTRES OF EXCELLENCE:
-        - Over 20 industry-supported Centres of Excellence
-        - Japan-India Institute for Manufacturing (JIM) - collaboration with Maruti Suzuki & Government of Japan
-        - Bosch-Rexroth for automation
-        - IBM for emerging technologies
-        - Recognized as Centre for Entrepreneurship Development (CED) nodal institute by Government of Gujarat
-        - Supports "Start-up India" initiative
-
-        FACILITIES & CAMPUS LIFE:
-        - Modern hostel facilities
-        - Sports tournaments and cultural programs
-        - Hosts academic conferences and workshops
-        - Vibrant student life with modern amenities
-
-        RULES FOR ANSWERING:
-        1. Answer directly in 1-5 sentences based on the question.
-        2. Use ONLY the facts above when answering about Ganpat University.
-        3. For non-university questions, give brief, helpful general answers.
-        4. Do NOT greet unless the user greets first.
-        5. Do NOT ask "How can I help?" or similar phrases.
-        6. Do NOT mention you are an AI or assistant.
-        7. Do NOT repeat the user's question.
-        8. Provide ONLY the final answer - clear and concise.
-
-        User's question: {user_message}
-
-        Answer:"""
-                
-                response = client.models.generate_content(
-                    model="gemini-2.5-flash",
-                    contents=prompt,
-                    config=types.GenerateContentConfig(
-                        temperature=0.2,  # Very low for consistent factual answers
-                        max_output_tokens=350,
-                        top_p=0.9,
-                        top_k=40
-                    )
+async def find_free_rooms(context: Dict, timer: RequestTimer) -> list:
+    """Free rooms for a ROOM_AVAILABILITY context (occupancy bitmaps when loaded, else SQL)"""
+    time_info = context.get('time_info', {})
+    
+    logger.debug("Room availability lookup", extra={"time_info": time_info})
+    
+    if room_occupancy.loaded:
+        # Answered in-process from the occupancy bitmaps (room_occupancy.py)
+        with timer.stage("db_fetch"):
+            if time_info.get('is_now', True):
+                now = datetime.now().time()
+                results = room_occupancy.free_rooms(now, now)
+            else:
+                results = room_occupancy.free_rooms(
+                    parse_sql_time(time_info.get('start_time', '00:00:00')),
+                    parse_sql_time(time_info.get('end_time', '23:59:59')),
                 )
-                
-                if response and hasattr(response, "text") and response.text:
-                    reply = response.text.strip()
-                    
-                    # Clean up common AI phrases that might slip through
-                    unwanted_phrases = [
-                        "As an AI", "I'm an AI", "As a language model",
-                        "I am an assistant", "As an assistant",
-                        "According to the information provided",
-                        "Based on the facts above"
-                    ]
-                    
-                    for phrase in unwanted_phrases:
-                        reply = reply.replace(phrase, "").strip()
-                    
-                    # Remove leading colons or dashes if present
-                    reply = reply.lstrip(":- ").strip()
-                    
-                    if reply:
-                        return {"reply": reply}
-                
-                return {"reply": "I'm not sure how to answer that. Could you rephrase your question?"}
-                
-            except Exception as e:
-                print(f"Error in general query: {str(e)}")
-                return {"reply": "Sorry, I encountered an error. Please try asking again."}
-        # === PERSON LOOKUP ===
-        if detected_type == QueryType.PERSON_LOOKUP:
-            person_info = context.get('person_identifier', {})
-            print(f"👤 Person info: {person_info}")
-            
-            sql = build_person_lookup_sql(person_info)
-            if not sql:
-                return {"reply": "Please provide a name, enrollment number, phone, or email to search."}
-            
-            print(f"📊 SQL: {sql[:100]}...")
-            
-            try:
-                results = await fetch_query_async(sql)
-                print(f"✅ Found {len(results)} results")
-            except Exception as e:
-                print(f"❌ DB Error: {e}")
-                return {"reply": f"Database error: {e}"}
-            
-            # If no student found and searching by name, try teachers
-            if not results and person_info.get('type') == 'name':
-                print("🔄 Searching teachers...")
-                teacher_sql = build_teacher_search_sql(person_info.get('value', ''))
-                try:
-                    results = await fetch_query_async(teacher_sql)
-                    print(f"✅ Found {len(results)} teachers")
-                    if results:
-                        return {"reply": format_teacher_response(results), "result_count": len(results)}
-                except Exception as e:
-                    print(f"❌ Teacher search error: {e}")
-            
-            if not results:
-                return {"reply": "No matching person found. Please check:\n• Name spelling (try full name)\n• Enrollment number (11 digits for students)\n• Try with different search terms"}
-            
-            # Format response based on type
-            if results[0].get('person_type') == 'teacher':
-                return {"reply": format_teacher_response(results), "result_count": len(results)}
-            return {"reply": format_student_response(results), "result_count": len(results)}
-
-        # === BATCH TIMETABLE ===
-        if detected_type == QueryType.BATCH_TIMETABLE:
-            batch_name = context.get('class_batch_name')
-            day = context.get('day')
-            
-            if not batch_name:
-                return {"reply": "Please specify a batch name (e.g., 7CE-A-2)."}
-            
-            if not day:
-                return {"reply": f"Please specify a day for {batch_name}'s timetable (e.g., Monday, Tuesday)."}
-            
-            day_binary = get_day_binary(day)
-            sql = build_batch_timetable_sql(batch_name, day_binary)
-            
-            print(f"📊 Timetable SQL for {batch_name} on {day}")
-            
-            try:
-                results = await fetch_query_async(sql)
-                print(f"✅ Found {len(results)} entries")
-            except Exception as e:
-                print(f"❌ DB Error: {e}")
-                return {"reply": f"Database error: {e}"}
-            
-            return {"reply": format_timetable_response(results, context), "result_count": len(results)}
-
-        # === WHERE IS BATCH ===
-        if detected_type == QueryType.WHERE_IS_BATCH:
-            batch_name = context.get('class_batch_name')
-            
-            if not batch_name:
-                return {"reply": "Please specify a batch name (e.g., 7CE-A-2)."}
-            
-            sql = build_where_is_batch_sql(batch_name)
-            
-            print(f"📍 Where is {batch_name}")
-            
-            try:
-                results = await fetch_query_async(sql)
-                print(f"✅ Found {len(results)} entries")
-            except Exception as e:
-                print(f"❌ DB Error: {e}")
-                return {"reply": f"Database error: {e}"}
-            
-            return {"reply": format_where_is_batch_response(results, context)}
-
-        # === ROOM AVAILABILITY ===
-        if detected_type == QueryType.ROOM_AVAILABILITY:
-            time_info = context.get('time_info', {})
-            
+    else:
+        with timer.stage("sql_build"):
             if time_info.get('is_now', True):
-                sql = build_free_rooms_now_sql()
+                sql, params = build_free_rooms_now_sql()
             else:
                 start = time_info.get('start_time', '00:00:00')
                 end = time_info.get('end_time', '23:59:59')
-                sql = build_free_rooms_time_sql(start, end)
-            
-            print(f"🏫 Room availability query")
-            
+                sql, params = build_free_rooms_time_sql(start, end)
+        with timer.stage("db_fetch"):
+            results = await fetch_query_async(sql, params)
+    logger.info("Found free rooms", extra={"result_count": len(results)})
+    return results
+
+
+NO_PERSON_FOUND_REPLY = "No matching person found. Please check:\n• Name spelling (try full name)\n• Enrollment number (11 digits for students)\n• Try with different search terms"
+
+
+async def answer_message(user_message: str, timer: RequestTimer, context: Optional[Dict] = None) -> Dict:
+    """Classify one message (unless already classified) and build its reply, recording stage timings on timer"""
+    if context is None:
+        context = classify(user_message, timer)
+    detected_type = context['query_type']
+    logger.info("Detected query", extra={"query_type": detected_type})
+    logger.debug("Query context", extra={"context": context})
+
+    # === GREETING ===
+    if detected_type == QueryType.GREETING:
+        return {"reply": "Hello! 👋 I'm your Ganpat University assistant.\n\nI can help you with:\n• Student/Teacher information\n• Batch timetables\n• Room availability\n\nWhat would you like to know?"}
+
+    # === GENERAL QUERY ===
+    if detected_type == QueryType.GENERAL:
+        try:
+            reply = answer_cache.get(user_message)
+            if reply is None:
+                with timer.stage("llm"):
+                    reply = await answer_general_question(user_message)
+                if reply:
+                    answer_cache.set(user_message, reply)
+            if reply:
+                return {"reply": reply}
+
+            return {"reply": "I'm not sure how to answer that. Could you rephrase your question?"}
+
+        except asyncio.TimeoutError:
+            logger.warning("General query timed out")
+            return {"reply": "That's taking longer than expected. Please try asking again in a moment."}
+        except Exception as e:
+            logger.error("Error in general query: %s", e)
+            return {"reply": "Sorry, I encountered an error. Please try asking again."}
+    # === PERSON LOOKUP ===
+    if detected_type == QueryType.PERSON_LOOKUP:
+        person_info = context.get('person_identifier', {})
+        logger.debug("Person lookup", extra={"person_info": person_info})
+        
+        with timer.stage("sql_build"):
+            lookup = build_person_lookup_sql(person_info)
+        if not lookup:
+            return {"reply": "Please provide a name, enrollment number, phone, or email to search."}
+        sql, params = lookup
+        
+        logger.debug("Person lookup SQL", extra={"sql": sql[:100]})
+        
+        if person_info.get('type') == 'teacher_id' and faculty_directory.loaded:
+            # Answered in-process from the faculty directory (faculty_directory.py); a miss
+            # falls through to the query below, for faculty added since the last reload
+            teacher = faculty_directory.by_employee_id(person_info['value'])
+            if teacher:
+                with timer.stage("format"):
+                    return {"reply": format_teacher_response([teacher]), "result_count": 1}
+        
+        if person_info.get('type') == 'name':
+            # Teachers come from the faculty directory (short codes, initials, name words)
+            # when it has a hit; otherwise students and teachers are searched concurrently
+            # (one pooled connection each). Both are ranked together by match_score; if one
+            # search fails the other's rows are still shown, marked as partial.
+            teachers = faculty_directory.lookup(person_info['value']) if faculty_directory.loaded else []
+            searches = [fetch_query_async(sql, params)]
+            if not teachers:
+                with timer.stage("sql_build"):
+                    teacher_sql, teacher_params = build_teacher_search_sql(person_info.get('value', ''))
+                searches.append(fetch_query_async(teacher_sql, teacher_params))
+            with timer.stage("db_fetch"):
+                found = await asyncio.gather(*searches, return_exceptions=True)
+            students = found[0]
+            if len(found) > 1:
+                teachers = found[1]
+            failed = []
+            if isinstance(teachers, Exception):
+                logger.error("Teacher search error: %s", teachers)
+                failed.append(("teacher", teachers))
+                teachers = []
+            if isinstance(students, Exception):
+                logger.error("Student search error: %s", students)
+                failed.append(("student", students))
+                students = []
+            results = merge_name_matches(students, teachers)
+            logger.info("Found results", extra={
+                "result_count": len(results), "students": len(students), "teachers": len(teachers),
+                "failed_searches": [kind for kind, _ in failed],
+            })
+            if failed and not results:
+                return {"reply": f"Database error: {failed[0][1]}"}
+            if failed:
+                with timer.stage("format"):
+                    missing = " and ".join(kind for kind, _ in failed)
+                    reply = (format_person_response(results).rstrip()
+                             + f"\n\n⚠️ Partial results: the {missing} search failed, so some matches may be missing.")
+                return {"reply": reply, "result_count": len(results), "partial": True}
+        else:
             try:
-                results = await fetch_query_async(sql)
-                print(f"✅ Found {len(results)} free rooms")
+                with timer.stage("db_fetch"):
+                    results = await fetch_person(person_info, sql, params)
+                logger.info("Found results", extra={"result_count": len(results)})
             except Exception as e:
-                print(f"❌ DB Error: {e}")
+                logger.error("DB error: %s", e)
                 return {"reply": f"Database error: {e}"}
-            
+        
+        if not results:
+            return {"reply": NO_PERSON_FOUND_REPLY}
+        
+        with timer.stage("format"):
+            return {"reply": format_person_response(results), "result_count": len(results)}
+
+    # === BATCH TIMETABLE ===
+    if detected_type == QueryType.BATCH_TIMETABLE:
+        batch_name = context.get('class_batch_name')
+        day = context.get('day')
+        
+        if not batch_name:
+            return {"reply": "Please specify a batch name (e.g., 7CE-A-2)."}
+        
+        if not day:
+            return {"reply": f"Please specify a day for {batch_name}'s timetable (e.g., Monday, Tuesday)."}
+        
+        day_binary = get_day_binary(day)
+        
+        logger.debug("Timetable lookup", extra={"batch_name": batch_name, "day": day})
+        
+        try:
+            with timer.stage("db_fetch"):
+                results = await fetch_batch_timetable(batch_name, day_binary)
+            logger.info("Found entries", extra={"result_count": len(results)})
+        except Exception as e:
+            logger.error("DB error: %s", e)
+            return {"reply": f"Database error: {e}"}
+        
+        with timer.stage("format"):
+            return {"reply": format_timetable_response(results, context), "result_count": len(results)}
+
+    # === WEEK TIMETABLE ===
+    if detected_type == QueryType.WEEK_TIMETABLE:
+        batch_name = context.get('class_batch_name')
+        
+        try:
+            with timer.stage("db_fetch"):
+                week = await fetch_week_timetable(batch_name)
+        except Exception as e:
+            logger.error("DB error: %s", e)
+            return {"reply": f"Database error: {e}"}
+        
+        with timer.stage("format"):
+            return {
+                "reply": format_week_timetable_response(week, batch_name),
+                "result_count": sum(len(results) for results in week.values()),
+            }
+
+    # === WHERE IS BATCH ===
+    if detected_type == QueryType.WHERE_IS_BATCH:
+        batch_name = context.get('class_batch_name')
+        
+        if not batch_name:
+            return {"reply": "Please specify a batch name (e.g., 7CE-A-2)."}
+        
+        logger.debug("Where-is lookup", extra={"batch_name": batch_name})
+        
+        try:
+            if schedule_index.loaded:
+                # Answered in-process from the weekly schedule (schedule.py)
+                with timer.stage("db_fetch"):
+                    results = schedule_index.current(batch_name, current_day_code(), datetime.now().time())
+            else:
+                with timer.stage("sql_build"):
+                    sql, params = build_where_is_batch_sql(batch_name)
+                with timer.stage("db_fetch"):
+                    results = await fetch_query_async(sql, params)
+            logger.info("Found entries", extra={"result_count": len(results)})
+        except Exception as e:
+            logger.error("DB error: %s", e)
+            return {"reply": f"Database error: {e}"}
+        
+        with timer.stage("format"):
+            return {"reply": format_where_is_batch_response(results, context)}
+
+    # === ROOM AVAILABILITY ===
+    if detected_type == QueryType.ROOM_AVAILABILITY:
+        try:
+            results = await find_free_rooms(context, timer)
+        except Exception as e:
+            logger.error("DB error: %s", e)
+            return {"reply": f"Database error: {e}"}
+        
+        with timer.stage("format"):
             return {"reply": format_free_rooms_response(results), "result_count": len(results)}
 
-        # === CLASS TIMETABLE (Fallback) ===
-        if detected_type == QueryType.TIMETABLE_VIEW:
-            return {"reply": "For timetables, please specify a batch like **7CE-A-2** with a day.\n\nExample: 'Timetable of 7CE-A-2 for Monday'"}
+    # === CLASS TIMETABLE (Fallback) ===
+    if detected_type == QueryType.TIMETABLE_VIEW:
+        return {"reply": "For timetables, please specify a batch like **7CE-A-2** with a day.\n\nExample: 'Timetable of 7CE-A-2 for Monday'"}
+
+    return {"reply": "I couldn't understand your request. Try asking about:\n• Student/Teacher details\n• Batch timetables\n• Free classrooms"}
+
+
+# ============================================================================
+# STREAMING CHAT ENDPOINT (Server-Sent Events)
+# ============================================================================
+
+def _sse(event: str, payload: Dict) -> str:
+    return f"event: {event}\ndata: {dumps(payload).decode()}\n\n"
+
+
+async def stream_message(user_message: str, timer: RequestTimer) -> AsyncIterator[str]:
+    """
+    Reply text for one message as it becomes available: Gemini tokens for GENERAL,
+    one chunk per period (or per day for a week) for timetables, one per section
+    for free rooms, the whole reply otherwise.
+    """
+    context = classify(user_message, timer)
+    detected_type = context['query_type']
+    logger.info("Detected query", extra={"query_type": detected_type, "stream": True})
+
+    # === GENERAL QUERY (token stream) ===
+    if detected_type == QueryType.GENERAL:
+        reply = answer_cache.get(user_message)
+        if reply is not None:
+            yield reply
+            return
+
+        parts = []
+        answer = stream_general_answer(user_message)
+        # Only the waits on Gemini count as "llm", not the client reading each chunk
+        llm_seconds = 0.0
+        try:
+            while True:
+                started = perf_counter()
+                try:
+                    text = await answer.__anext__()
+                except StopAsyncIteration:
+                    break
+                finally:
+                    llm_seconds += perf_counter() - started
+                parts.append(text)
+                yield text
+        except asyncio.TimeoutError:
+            logger.warning("General query timed out")
+            yield ("\n\n" if parts else "") + "That's taking longer than expected. Please try asking again in a moment."
+            return
+        except Exception as e:
+            logger.error("Error in general query: %s", e)
+            yield ("\n\n" if parts else "") + "Sorry, I encountered an error. Please try asking again."
+            return
+        finally:
+            await answer.aclose()
+            timer.record("llm", llm_seconds)
+
+        reply = clean_general_reply("".join(parts))
+        if reply:
+            answer_cache.set(user_message, reply)
+        else:
+            yield "I'm not sure how to answer that. Could you rephrase your question?"
+        return
+
+    # === BATCH TIMETABLE (row by row) ===
+    if detected_type == QueryType.BATCH_TIMETABLE and context.get('class_batch_name') and context.get('day'):
+        try:
+            with timer.stage("db_fetch"):
+                results = await fetch_batch_timetable(context['class_batch_name'], get_day_binary(context['day']))
+        except Exception as e:
+            logger.error("DB error: %s", e)
+            yield f"Database error: {e}"
+            return
+
+        for chunk in timetable_response_chunks(results, context):
+            yield chunk
+        return
+
+    # === WEEK TIMETABLE (day by day) ===
+    if detected_type == QueryType.WEEK_TIMETABLE:
+        try:
+            with timer.stage("db_fetch"):
+                week = await fetch_week_timetable(context['class_batch_name'])
+        except Exception as e:
+            logger.error("DB error: %s", e)
+            yield f"Database error: {e}"
+            return
+
+        for chunk in week_timetable_response_chunks(week, context['class_batch_name']):
+            yield chunk
+        return
+
+    # === ROOM AVAILABILITY (section by section) ===
+    if detected_type == QueryType.ROOM_AVAILABILITY:
+        try:
+            results = await find_free_rooms(context, timer)
+        except Exception as e:
+            logger.error("DB error: %s", e)
+            yield f"Database error: {e}"
+            return
+
+        for chunk in free_rooms_response_chunks(results):
+            yield chunk
+        return
+
+    reply = await answer_message(user_message, timer, context)
+    yield reply["reply"]
+
+
+@app.post("/chat/stream")
+async def chat_stream(request: Request):
+    """
+    /chat as Server-Sent Events: "chunk" events carrying {"text": ...} to append,
+    then a single "done" event.
+    """
+    request_id = new_request_id(request.headers.get("x-request-id"))
+    # Read up front: a malformed body still gets the event stream, ending in the error chunk
+    error = None
+    try:
+        data = await request.json()
+        user_message = data.get("message", "").strip()
+    except Exception as e:
+        logger.exception("Chat stream request could not be read")
+        user_message, error = "", str(e)
+
+    async def events():
+        timer = RequestTimer()
+        try:
+            if error:
+                yield _sse("chunk", {"text": "Something went wrong. Please try again.", "error": error})
+            elif not user_message:
+                yield _sse("chunk", {"text": "Please send a message."})
+            else:
+                async for text in stream_message(user_message, timer):
+                    yield _sse("chunk", {"text": text})
+        except Exception:
+            logger.exception("Chat stream failed")
+            yield _sse("chunk", {"text": "Something went wrong. Please try again."})
+        finally:
+            timer.finish()
+        yield _sse("done", {})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        # X-Accel-Buffering: keep nginx-style proxies from holding chunks back
+        headers={"X-Request-ID": request_id, "Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+# ============================================================================
+# BATCH CHAT ENDPOINT
+# ============================================================================
+
+CHAT_BATCH_MAX_MESSAGES = int(os.getenv("CHAT_BATCH_MAX_MESSAGES", "50"))
+
+
+async def _answer_enrollment_group(items: list, replies: list):
+    """items: (index, context, timer) for enrollment-number lookups; one query for all cache misses"""
+    enrollment_nos = [context['person_identifier']['value'].strip() for _, context, _ in items]
+    by_enrollment = {}
+    missing = []
+    for enrollment_no in dict.fromkeys(enrollment_nos):
+        cached = person_cache.get(('student_enrollment', enrollment_no.lower()))
+        if cached:
+            by_enrollment[enrollment_no] = cached[0]
+        else:
+            missing.append(enrollment_no)
 
-        return {"reply": "I couldn't understand your request. Try asking about:\n• Student/Teacher details\n• Batch timetables\n• Free classrooms"}
+    group = RequestTimer()
+    if missing:
+        try:
+            with group.stage("sql_build"):
+                sql, params = build_enrollments_lookup_sql(missing)
+            with group.stage("db_fetch"):
+                rows = await fetch_query_async(sql, params)
+        except Exception as e:
+            logger.error("DB error: %s", e)
+            for index, _, _ in items:
+                replies[index] = {"reply": f"Database error: {e}"}
+            return
 
+        for row in rows:
+            by_enrollment[row['enrollment_no']] = row
+            person_cache.set(('student_enrollment', str(row['enrollment_no']).lower()), [row])
+    for (index, _, timer), enrollment_no in zip(items, enrollment_nos):
+        timer.add_stages(group)
+        row = by_enrollment.get(enrollment_no)
+        if row is None:
+            replies[index] = {"reply": NO_PERSON_FOUND_REPLY}
+            continue
+        with timer.stage("format"):
+            replies[index] = {"reply": format_student_response([row]), "result_count": 1}
+
+
+async def _answer_timetable_group(items: list, replies: list):
+    """items: (index, context, timer) for batch timetables; cache misses share one query"""
+    keys = [(context['class_batch_name'], get_day_binary(context['day'])) for _, context, _ in items]
+    group = RequestTimer()
+    try:
+        with group.stage("db_fetch"):
+            timetables = await fetch_batch_timetables(keys)
     except Exception as e:
-        print(f"❌ Error: {e}")
-        import traceback
-        traceback.print_exc()
-        return {"reply": "Something went wrong. Please try again.", "error": str(e)}
+        logger.error("DB error: %s", e)
+        for index, _, _ in items:
+            replies[index] = {"reply": f"Database error: {e}"}
+        return
+
+    for (index, context, timer), key in zip(items, keys):
+        timer.add_stages(group)
+        results = timetables[key]
+        with timer.stage("format"):
+            replies[index] = {"reply": format_timetable_response(results, context), "result_count": len(results)}
+
+
+@app.post("/chat/batch")
+async def chat_batch(request: Request):
+    """
+    Answer several messages in one call: {"messages": [...]} -> {"replies": [...]} in the same order.
+    Enrollment lookups and batch timetables are grouped into one set-based query per type;
+    groups and the remaining messages run concurrently over the pool.
+    """
+    headers = {"X-Request-ID": new_request_id(request.headers.get("x-request-id"))}
+    try:
+        data = await request.json()
+    except ValueError:  # not JSON / not UTF-8
+        data = None
+    messages = data.get("messages") if isinstance(data, dict) else None
+
+    if not isinstance(messages, list) or not messages or not all(isinstance(m, str) for m in messages):
+        return FastJSONResponse({"replies": [], "error": 'Please send {"messages": [...]}, a non-empty list of strings.'},
+                                status_code=400, headers=headers)
+    if len(messages) > CHAT_BATCH_MAX_MESSAGES:
+        return FastJSONResponse({"replies": [], "error": f"At most {CHAT_BATCH_MAX_MESSAGES} messages per batch."},
+                                status_code=400, headers=headers)
+
+    replies: List[Optional[Dict]] = [None] * len(messages)
+    timers = [RequestTimer() for _ in messages]
+    enrollment_group, timetable_group, singles = [], [], []
+
+    for index, (message, timer) in enumerate(zip(messages, timers)):
+        message = message.strip()
+        if not message:
+            replies[index] = {"reply": "Please send a message."}
+            continue
+
+        context = classify(message, timer)
+        detected_type = context['query_type']
+        if (detected_type == QueryType.PERSON_LOOKUP
+                and context.get('person_identifier', {}).get('type') == 'student_enrollment'):
+            enrollment_group.append((index, context, timer))
+        elif detected_type == QueryType.BATCH_TIMETABLE and context.get('class_batch_name') and context.get('day'):
+            timetable_group.append((index, context, timer))
+        else:
+            singles.append((index, message, context))
+
+    logger.info("Batch chat", extra={
+        "messages": len(messages),
+        "enrollment_group": len(enrollment_group),
+        "timetable_group": len(timetable_group),
+    })
+
+    async def answer_single(index: int, message: str, context: Dict):
+        try:
+            replies[index] = await answer_message(message, timers[index], context)
+        except Exception as e:
+            logger.exception("Batch chat message failed")
+            replies[index] = {"reply": "Something went wrong. Please try again.", "error": str(e)}
+
+    jobs = [answer_single(*single) for single in singles]
+    if enrollment_group:
+        jobs.append(_answer_enrollment_group(enrollment_group, replies))
+    if timetable_group:
+        jobs.append(_answer_timetable_group(timetable_group, replies))
+    await asyncio.gather(*jobs)
+
+    for timer in timers:
+        timer.finish()
+    return FastJSONResponse({"replies": replies}, headers=headers)
 
 
 @app.get("/")
@@ -729,14 +1144,215 @@ async def health_check():
         return {"status": "unhealthy", "database": str(e)}
 
 
+POOL_CONNECTION_STATES = ("size", "idle", "acquired", "min_size", "max_size")
+
+
+@app.get("/metrics")
+async def metrics_endpoint():
+    """Prometheus scrape target: per-stage latency histograms, pool and cache gauges"""
+    pool = pool_stats()
+    extra = [
+        *metrics.render_gauges("db_pool_connections", "asyncpg pool connections",
+                               {k: v for k, v in pool.items() if k in POOL_CONNECTION_STATES}, "state"),
+        *metrics.render_gauges("db_pool", "Pool utilization, queued callers and acquire waits",
+                               {k: v for k, v in pool.items() if k not in POOL_CONNECTION_STATES}, "stat"),
+        *metrics.render_gauges("db_query_coalescing", "SELECTs executed vs. joined to an identical in-flight one",
+                               coalesce_stats(), "stat"),
+        *metrics.render_gauges("log_records", "Log records by outcome", {"dropped": dropped_records()}, "outcome"),
+    ]
+    for cache_name, stats in (
+        ("timetable", timetable_cache.stats()),
+        ("person", person_cache.stats()),
+        ("general_answers", answer_cache.stats()),
+    ):
+        extra.extend(metrics.render_gauges(
+            f"cache_{cache_name}", f"{cache_name} cache counters", stats, "stat"))
+    return PlainTextResponse(metrics.render(extra), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/rooms/free")
+async def free_rooms(
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    minutes: Optional[int] = None,
+    slots: Optional[str] = None,
+    rooms: Optional[str] = None,
+):
+    """
+    Free rooms from the occupancy bitmaps, for kiosks and integrations.
+    
+    start/end: HH:MM (default now); sessions repeat every day, so there is no day;
+    minutes: free for this long from start; slots: "09:00-10:00,14:00-15:00"
+    (free in all of them); rooms: comma-separated classroom ids to check
+    (ids not in the classroom table are listed under "unknown_rooms").
+    """
+    if not room_occupancy.loaded:
+        return FastJSONResponse({"error": "Room occupancy is not loaded yet"}, status_code=503)
+    
+    try:
+        start_t = parse_clock(start) if start else datetime.now().time()
+        
+        if slots:
+            ranges = [parse_slot(slot) for slot in slots.split(',')]
+        elif minutes is not None:
+            if minutes <= 0:
+                raise ValueError(f"minutes must be positive, got {minutes}")
+            end_minutes = min(start_t.hour * 60 + start_t.minute + minutes, 24 * 60 - 1)
+            ranges = [(start_t, time(end_minutes // 60, end_minutes % 60))]
+        else:
+            ranges = [(start_t, parse_clock(end) if end else start_t)]
+    except ValueError as e:
+        return FastJSONResponse({"error": f"Invalid time: {e}"}, status_code=400)
+    
+    if rooms:
+        classroom_ids = [cid.strip() for cid in rooms.split(',') if cid.strip()]
+        answer = room_occupancy.are_free(classroom_ids, ranges)
+        return FastJSONResponse({
+            "rooms": answer,
+            "unknown_rooms": [cid for cid in dict.fromkeys(classroom_ids) if cid not in answer],
+        })
+    
+    results = room_occupancy.free_rooms_multi(ranges)
+    return FastJSONResponse({"count": len(results), "free_rooms": results})
+
+
+@app.get("/timetable/{batch}/week")
+async def week_timetable(batch: str):
+    """
+    A batch's timetable for Monday-Saturday from one query (shares timetable_cache
+    with the per-day /chat view): structured days plus the formatted chat reply.
+    """
+    batch_name = batch.strip().upper()
+    try:
+        week = await fetch_week_timetable(batch_name)
+    except Exception as e:
+        logger.error("DB error: %s", e)
+        return {"error": f"Database error: {e}"}
+    
+    # Records and their time values go to orjson as-is (responses.py)
+    return FastJSONResponse({
+        "batch": batch_name,
+        "days": [
+            {"day": BINARY_TO_DAY[day_binary], "day_code": day_binary, "entries": results}
+            for day_binary, results in week.items()
+        ],
+        "reply": format_week_timetable_response(week, batch_name),
+    })
+
+
+@app.get("/admin/cache/stats")
+async def cache_stats():
+    """Hit/miss counters and sizes of the in-process caches"""
+    return {
+        "timetable": timetable_cache.stats(),
+        "person": person_cache.stats(),
+        "general_answers": answer_cache.stats(),
+        "db_query_coalescing": coalesce_stats(),
+    }
+
+
+@app.get("/admin/db/pool")
+async def db_pool_stats():
+    """Pool configuration next to live utilization and acquire-wait figures, for sizing the pool"""
+    return {
+        "config": {key: DB_CONFIG[key] for key in (
+            "min_size", "max_size", "acquire_timeout", "command_timeout",
+            "max_queries", "max_inactive_lifetime", "statement_cache_size",
+        )},
+        "stats": pool_stats(),
+    }
+
+
+@app.post("/admin/cache/answers/clear")
+async def clear_answer_cache():
+    """Drop cached GENERAL answers (e.g. after editing the facts prompt)"""
+    answer_cache.clear()
+    return {"cache": answer_cache.stats()}
+
+
+@app.post("/admin/cache/person/invalidate")
+async def invalidate_person_cache(request: Request):
+    """Drop cached person lookups - all of them, or those returning one enrollment number"""
+    try:
+        data = await request.json()
+    except Exception:
+        data = {}
+    
+    enrollment_no = (data.get("enrollment_no") or "").strip()
+    if enrollment_no:
+        stale = {
+            key for key, rows, _ in person_cache.items()
+            if any(str(row.get('enrollment_no')) == enrollment_no for row in rows)
+        }
+        removed = person_cache.invalidate(lambda key: key in stale)
+    else:
+        removed = person_cache.invalidate()
+    
+    logger.info("Invalidated %d cached person lookups", removed)
+    return {"removed": removed, "cache": person_cache.stats()}
+
+
+@app.post("/admin/cache/timetable/invalidate")
+async def invalidate_timetable_cache(request: Request):
+    """Drop cached timetables - all of them, or one batch (optionally one day: MON..SAT)"""
+    try:
+        data = await request.json()
+    except Exception:
+        data = {}
+    
+    batch_name = (data.get("batch_name") or "").strip().upper()
+    day = data.get("day")
+    # Not get_day_binary: it maps unknown days to Friday, so a typo would clear the wrong day
+    day_binary = DAY_TO_BINARY.get(str(day).strip().upper()) if day else None
+    if day and day_binary is None:
+        return FastJSONResponse({"error": f"Invalid day: {day} (expected MON..SAT)"}, status_code=400)
+    
+    removed = timetable_cache.invalidate(
+        lambda key: (not batch_name or key[0] == batch_name)
+        and (not day_binary or key[1] == day_binary)
+    )
+    logger.info("Invalidated %d cached timetables", removed)
+    return {"invalidated": removed, "cache": timetable_cache.stats()}
+
+
+@app.post("/admin/faculty/refresh")
+async def refresh_faculty():
+    """Reload the faculty directory after teacher_enrollment_info changes"""
+    await load_faculty_directory()
+    return {"teachers": len(faculty_directory), "loaded_at": faculty_directory.loaded_at.isoformat()}
+
+
+@app.post("/admin/schedule/refresh")
+async def refresh_schedule():
+    """Rebuild the batch_schedule view after timetable data changes"""
+    try:
+        await refresh_batch_schedule()
+        return {"status": "refreshed"}
+    except Exception as e:
+        return {"status": "failed", "error": str(e)}
+
+
 @app.on_event("startup")
 async def startup():
+    if os.getenv("DB_AUTO_MIGRATE", "0") == "1":
+        # Before the pool exists, so its connections warm statements against the migrated schema
+        await apply_migrations()
     await get_pool()
-    print("✅ Server started - All queries hardcoded")
+    await start_background_jobs()
+    try:
+        answer_cache.load()
+    except Exception as e:
+        logger.warning("Could not load answer cache: %s", e)
+    logger.info("Server started - All queries hardcoded")
 
 
 @app.on_event("shutdown")
 async def shutdown():
     from db import close_pool
 
+    stop_background_jobs()
+    try:
+        answer_cache.save()
+    except Exception as e:
+        logger.warning("Could not save answer cache: %s", e)
     await close_pool()
@@ -0,0 +1,113 @@
+# metrics.py - Per-stage request timings exposed in Prometheus text format
+#
+# Stages: classify, context, sql_build, db_fetch, format, llm (plus the whole
+# request), labelled by QueryType. db_fetch also covers lookups answered from
+# the in-memory schedule/room indexes.
+# Also: the wait for a pooled DB connection (db_pool_acquire_seconds).
+# No client library needed; the /metrics endpoint in main.py renders the
+# registry below.
+
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Seconds. Dense under 50ms where in-memory answers land, sparse up to the LLM timeout.
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20)
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{n}="{v}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Histogram:
+    """Cumulative-bucket histogram keyed by a tuple of label values"""
+
+    def __init__(self, name: str, help_text: str, label_names: Tuple[str, ...],
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = buckets
+        self._series: Dict[Tuple[str, ...], List] = {}  # labels -> [bucket counts, sum, count]
+
+    def observe(self, labels: Tuple[str, ...], value: float):
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [[0] * len(self.buckets), 0.0, 0]
+        counts = series[0]
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                counts[i] += 1
+        series[1] += value
+        series[2] += 1
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help_text}"
+        yield f"# TYPE {self.name} histogram"
+        for labels, (counts, total, count) in sorted(self._series.items()):
+            for bound, n in zip(self.buckets, counts):
+                le = 'le="%s"' % bound
+                yield f"{self.name}_bucket{_format_labels(self.label_names, labels, le)} {n}"
+            le = 'le="+Inf"'
+            yield f"{self.name}_bucket{_format_labels(self.label_names, labels, le)} {count}"
+            yield f"{self.name}_sum{_format_labels(self.label_names, labels)} {total}"
+            yield f"{self.name}_count{_format_labels(self.label_names, labels)} {count}"
+
+
+STAGE_SECONDS = Histogram(
+    "chat_stage_seconds", "Time spent per /chat stage", ("stage", "query_type"))
+REQUEST_SECONDS = Histogram(
+    "chat_request_seconds", "End-to-end /chat latency", ("query_type",))
+POOL_ACQUIRE_SECONDS = Histogram(
+    "db_pool_acquire_seconds", "Wait for a pooled DB connection", ())
+
+
+class RequestTimer:
+    """
+    Collects stage durations for one request; finish() records them under the
+    request's final query_type (known only after classification).
+    """
+
+    def __init__(self):
+        self.query_type = "UNKNOWN"
+        self.started = time.perf_counter()
+        self.stages: List[Tuple[str, float]] = []
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages.append((name, time.perf_counter() - start))
+
+    def record(self, name: str, seconds: float):
+        """Add a stage the caller timed itself, e.g. the summed awaits of a stream"""
+        self.stages.append((name, seconds))
+
+    def add_stages(self, other: "RequestTimer"):
+        """Attribute another timer's stages (e.g. a query shared by a /chat/batch group) to this request"""
+        self.stages.extend(other.stages)
+
+    def finish(self):
+        for name, seconds in self.stages:
+            STAGE_SECONDS.observe((name, self.query_type), seconds)
+        REQUEST_SECONDS.observe((self.query_type,), time.perf_counter() - self.started)
+
+
+def render_gauges(name: str, help_text: str, values: Dict[str, Optional[float]], label: str) -> Iterable[str]:
+    """One gauge family with a single label, e.g. pool connections by state"""
+    yield f"# HELP {name} {help_text}"
+    yield f"# TYPE {name} gauge"
+    for key, value in values.items():
+        if value is not None:
+            yield f'{name}{{{label}="{key}"}} {value}'
+
+
+def render(extra: Iterable[str] = ()) -> str:
+    """Prometheus text exposition of all histograms followed by extra lines"""
+    lines = [*STAGE_SECONDS.render(), *REQUEST_SECONDS.render(), *POOL_ACQUIRE_SECONDS.render(), *extra]
+    return "\n".join(lines) + "\n"
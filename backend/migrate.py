@@ -0,0 +1,66 @@
+# migrate.py - Apply the SQL migrations in backend/migrations/ in order
+#
+# Usage (from backend/):
+#   python migrate.py
+# or set DB_AUTO_MIGRATE=1 to apply pending migrations on server startup.
+
+import logging
+import os
+from typing import List
+
+from db import connect
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "migrations")
+
+logger = logging.getLogger(__name__)
+
+
+def list_migrations() -> List[str]:
+    """Migration file names, sorted by their numeric prefix"""
+    return sorted(f for f in os.listdir(MIGRATIONS_DIR) if f.endswith(".sql"))
+
+
+async def apply_migrations() -> List[str]:
+    """
+    Apply every migration not yet recorded in schema_migrations.
+    Each file runs in its own transaction. Returns the names applied.
+    """
+    applied = []
+    conn = await connect()
+    try:
+        await conn.execute("""
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    version TEXT PRIMARY KEY,
+    applied_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+""")
+        done = {r["version"] for r in await conn.fetch("SELECT version FROM schema_migrations")}
+
+        for name in list_migrations():
+            if name in done:
+                continue
+            with open(os.path.join(MIGRATIONS_DIR, name), encoding="utf-8") as f:
+                sql = f.read()
+            async with conn.transaction():
+                await conn.execute(sql)
+                await conn.execute("INSERT INTO schema_migrations (version) VALUES ($1)", name)
+            logger.info("Applied migration %s", name)
+            applied.append(name)
+    finally:
+        await conn.close()
+
+    return applied
+
+
+if __name__ == "__main__":
+    import asyncio
+    from log import setup_logging
+
+    setup_logging()
+
+    async def main():
+        applied = await apply_migrations()
+        if not applied:
+            print("✅ Database is up to date")
+
+    asyncio.run(main())
@@ -0,0 +1,15 @@
+-- 0001_name_search_trgm.sql - Trigram indexes for fuzzy person-name search
+--
+-- Serves both the LIKE '%x%' substring match and the pg_trgm word-similarity
+-- operator (<%) used by name_search.py, so name lookups no longer scan the
+-- whole table.
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX IF NOT EXISTS idx_student_name_trgm
+    ON student_enrollment_information
+    USING gin (LOWER(name_of_student) gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS idx_teacher_name_trgm
+    ON teacher_enrollment_info
+    USING gin (LOWER(tt_display_full_name) gin_trgm_ops);
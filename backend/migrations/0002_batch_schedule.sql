@@ -0,0 +1,37 @@
+-- 0002_batch_schedule.sql - Flattened, indexed weekly schedule per batch
+--
+-- The timetable queries joined lesson through string_to_array() on
+-- group_ids/classroom_ids, which no index can serve. This view does that
+-- expansion once; the backend reads timetables from it and refreshes it
+-- with REFRESH MATERIALIZED VIEW CONCURRENTLY (see schedule.py).
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS batch_schedule AS
+SELECT DISTINCT
+    b.name AS batch_name,
+    c.days AS day_code,
+    c.period,
+    p.start_time,
+    p.end_time,
+    s.name AS subject,
+    cr.classroom_id,
+    cr.name AS classroom,
+    l.lesson_type,
+    l.lesson_id
+FROM batch b
+JOIN "group" g ON g.class_id = b.class_id
+JOIN lesson l ON g.group_id::text = ANY(
+    string_to_array(trim(both '{}' from l.group_ids), ',')
+)
+JOIN card c ON c.lesson_id = l.lesson_id
+JOIN subject s ON s.subject_id = l.subject_id
+JOIN classroom cr ON cr.classroom_id = ANY(
+    string_to_array(trim(both '{}' from l.classroom_ids), ',')
+)
+JOIN periods p ON p.period = c.period;
+
+-- Required for REFRESH ... CONCURRENTLY
+CREATE UNIQUE INDEX IF NOT EXISTS idx_batch_schedule_row
+    ON batch_schedule (batch_name, day_code, period, lesson_id, classroom_id);
+
+CREATE INDEX IF NOT EXISTS idx_batch_schedule_batch_day
+    ON batch_schedule (batch_name, day_code, start_time);
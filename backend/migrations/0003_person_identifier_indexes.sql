@@ -0,0 +1,21 @@
+-- 0003_person_identifier_indexes.sql - Indexes for exact person-identifier lookups
+--
+-- Enrollment numbers, phone numbers and e-mail addresses are matched with
+-- equality (e-mail case-insensitively), so each predicate in
+-- build_person_lookup_sql is served by an index. The phone and e-mail lookups
+-- OR two columns; separate indexes let Postgres combine them with a BitmapOr.
+
+CREATE INDEX IF NOT EXISTS idx_student_enrollment_no
+    ON student_enrollment_information (enrollment_no);
+
+CREATE INDEX IF NOT EXISTS idx_student_phone_no
+    ON student_enrollment_information (student_phone_no);
+
+CREATE INDEX IF NOT EXISTS idx_student_parents_phone_no
+    ON student_enrollment_information (parents_phone_no);
+
+CREATE INDEX IF NOT EXISTS idx_student_gnu_mail_lower
+    ON student_enrollment_information (LOWER(student_gnu_mail_id));
+
+CREATE INDEX IF NOT EXISTS idx_student_personal_mail_lower
+    ON student_enrollment_information (LOWER(student_personal_mail_id));
@@ -0,0 +1,95 @@
+# name_search.py - Ranked, typo-tolerant person name search (pg_trgm)
+#
+# Requires migrations/0001_name_search_trgm.sql. Candidates come from the
+# trigram GIN indexes: a substring match (LIKE) or a word-similarity match
+# (<%, threshold pg_trgm.word_similarity_threshold, default 0.6) so that
+# misspellings like "shashnk" still find "Shashank". Results are ranked by
+# similarity instead of alphabetically.
+
+import re
+from typing import Dict, List, Tuple
+
+HONORIFICS = {'prof', 'professor', 'dr', 'mr', 'mrs', 'ms', 'miss', 'sir', 'madam'}
+
+_NON_ALPHA = re.compile(r'[^a-z\s]')
+_SPACES = re.compile(r'\s+')
+
+
+def normalize_name(name: str) -> str:
+    """Lowercase, drop punctuation/honorifics and collapse whitespace"""
+    cleaned = _NON_ALPHA.sub(' ', name.lower())
+    words = [w for w in _SPACES.split(cleaned) if w and w not in HONORIFICS]
+    return ' '.join(words)
+
+
+def _name_params(name: str) -> tuple:
+    """(full name, first word, last word) - single names repeat the word"""
+    normalized = normalize_name(name)
+    parts = normalized.split() or ['']
+    return (normalized, parts[0], parts[-1])
+
+
+def build_student_name_search_sql(name: str) -> Tuple[str, tuple]:
+    """Build SQL + params for ranked student name search"""
+    return """
+SELECT
+    'student' as person_type,
+    enrollment_no,
+    name_of_student as name,
+    branch,
+    semester,
+    class,
+    student_phone_no as phone,
+    parents_phone_no as parent_phone,
+    student_gnu_mail_id as email,
+    gender,
+    GREATEST(
+        word_similarity($1, LOWER(name_of_student)),
+        CASE WHEN LOWER(name_of_student) LIKE '%' || $1 || '%' THEN 1.0 ELSE 0.0 END
+    ) AS match_score
+FROM student_enrollment_information
+WHERE LOWER(name_of_student) LIKE '%' || $1 || '%'
+   OR (LOWER(name_of_student) LIKE '%' || $2 || '%'
+       AND LOWER(name_of_student) LIKE '%' || $3 || '%')
+   OR $1 <% LOWER(name_of_student)
+ORDER BY match_score DESC, similarity($1, LOWER(name_of_student)) DESC, name_of_student
+LIMIT 10;
+""", _name_params(name)
+
+
+def build_teacher_name_search_sql(name: str) -> Tuple[str, tuple]:
+    """Build SQL + params for ranked teacher name search"""
+    return """
+SELECT
+    'teacher' as person_type,
+    user_id as employee_id,
+    tt_display_full_name as name,
+    email_id as email,
+    short,
+    GREATEST(
+        word_similarity($1, LOWER(tt_display_full_name)),
+        CASE WHEN LOWER(tt_display_full_name) LIKE '%' || $1 || '%' THEN 1.0 ELSE 0.0 END
+    ) AS match_score
+FROM teacher_enrollment_info
+WHERE LOWER(tt_display_full_name) LIKE '%' || $1 || '%'
+   OR (LOWER(tt_display_full_name) LIKE '%' || $2 || '%'
+       AND LOWER(tt_display_full_name) LIKE '%' || $3 || '%')
+   OR $1 <% LOWER(tt_display_full_name)
+ORDER BY match_score DESC, similarity($1, LOWER(tt_display_full_name)) DESC, tt_display_full_name
+LIMIT 10;
+""", _name_params(name)
+
+
+def merge_name_matches(*result_lists: List[Dict], limit: int = 10) -> List[Dict]:
+    """
+    Rank rows from several name searches (students, teachers) together by
+    match_score; ties keep the order of the lists given. When any row contains
+    the searched name verbatim (score 1.0), fuzzy-only matches are dropped.
+    """
+    rows = sorted(
+        (row for rows in result_lists for row in rows),
+        key=lambda row: -float(row.get('match_score') or 0),
+    )
+    if rows and float(rows[0].get('match_score') or 0) >= 1.0:
+        rows = [row for row in rows if float(row.get('match_score') or 0) >= 1.0]
+    return rows[:limit]
@@ -0,0 +1,39 @@
+# responses.py - orjson-backed JSON responses
+#
+# FastJSONResponse is the app's default response class. Endpoints on the hot
+# path (/chat, /chat/batch, /rooms/free, the week timetable) return it
+# directly: FastAPI runs jsonable_encoder over any plain dict an endpoint
+# returns, which walks and copies the whole payload before it is serialized.
+# orjson writes datetime.time (the periods table's start/end times) and
+# datetime natively; asyncpg records and Decimals go through _default.
+
+from decimal import Decimal
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+
+_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+
+def _default(value: Any) -> Any:
+    """Types orjson has no native encoding for"""
+    if isinstance(value, Decimal):
+        return float(value)
+    if hasattr(value, 'items'):
+        return dict(value.items())  # asyncpg.Record
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize to compact UTF-8 JSON bytes"""
+    return orjson.dumps(content, default=_default, option=_OPTIONS)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson; content may hold records and time values as-is"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
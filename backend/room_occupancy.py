@@ -0,0 +1,140 @@
+# room_occupancy.py - Bitmap room-occupancy engine for ROOM_AVAILABILITY
+#
+# One boolean row per room, two cells per minute of the day, built from
+# classroom_index and the session table - the same bookings the free-room
+# SQL fallback reads. Sessions carry no day, so every booking applies to
+# every day and there is one grid. "Which rooms are free between X and Y" is a slice +
+# any() over a NumPy array instead of a NOT IN (SELECT ... FROM session) scan.
+#
+# Cell 2*m is the instant at minute m, cell 2*m + 1 the open interval up to
+# minute m + 1, so answers match the SQL exactly for minute-aligned bookings:
+# a point in time ("now") is busy when start <= t <= end (BETWEEN), a range
+# when start < range_end AND end > range_start.
+
+import logging
+from datetime import datetime, time
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from db import fetch_query_async
+# Imported first so its loader is registered (and runs) before load_room_occupancy
+from classroom_index import classroom_index
+from schedule import register_loader
+
+logger = logging.getLogger(__name__)
+
+CELLS_PER_DAY = 2 * 24 * 60
+
+BOOKINGS_SQL = """
+SELECT classroom_id, start_time::time AS start_time, end_time::time AS end_time
+FROM session
+WHERE start_time IS NOT NULL AND end_time IS NOT NULL;
+"""
+
+TimeRange = Tuple[time, time]
+
+
+def _minute(t: time) -> int:
+    return t.hour * 60 + t.minute
+
+
+def _cell(t: time) -> int:
+    """The instant cell for a whole minute, else the open cell it falls in"""
+    return 2 * _minute(t) + (1 if t.second or t.microsecond else 0)
+
+
+def booking_span(start: time, end: time) -> Tuple[int, int]:
+    """Cells [first, last) a booking start..end (inclusive) occupies; seconds round outwards"""
+    first = 2 * _minute(start) + (1 if start.second or start.microsecond else 0)
+    last = _cell(end) + 1
+    return first, min(last, CELLS_PER_DAY)
+
+
+def query_span(start: time, end: time) -> Tuple[int, int]:
+    """
+    Cells [first, last) to check for start..end: just the instant's cell for
+    a point (start == end), else the open interval between them.
+    """
+    if start >= end:
+        cell = _cell(start)
+        return cell, cell + 1
+    first = 2 * _minute(start) + 1
+    last = _cell(end) + 1 if end.second or end.microsecond else 2 * _minute(end)
+    return first, max(last, first + 1)
+
+
+class RoomOccupancyIndex:
+    """Occupancy bitmap: rooms x cells of the day"""
+
+    def __init__(self):
+        self.rooms: List[Dict] = []
+        self._room_pos: Dict[str, int] = {}
+        self._busy: np.ndarray = np.zeros((0, CELLS_PER_DAY), dtype=bool)
+        self.loaded_at: Optional[datetime] = None
+
+    @property
+    def loaded(self) -> bool:
+        return self.loaded_at is not None
+
+    def load(self, rooms: List[Dict], bookings: Iterable[Dict]):
+        """Rebuild from classroom rows and (classroom_id, start_time, end_time) rows"""
+        room_pos = {r['classroom_id']: i for i, r in enumerate(rooms)}
+        busy = np.zeros((len(rooms), CELLS_PER_DAY), dtype=bool)
+
+        for b in bookings:
+            pos = room_pos.get(b['classroom_id'])
+            if pos is None:
+                continue
+            first, last = booking_span(b['start_time'], b['end_time'])
+            busy[pos, first:last] = True
+
+        self.rooms, self._room_pos, self._busy = list(rooms), room_pos, busy
+        self.loaded_at = datetime.now()
+
+    def _busy_mask(self, ranges: Sequence[TimeRange]) -> np.ndarray:
+        """Rooms busy at any point of any range (OR across ranges)"""
+        mask = np.zeros(len(self.rooms), dtype=bool)
+        for start, end in ranges:
+            first, last = query_span(start, end)
+            mask |= self._busy[:, first:last].any(axis=1)
+        return mask
+
+    def free_rooms(self, start: time, end: time) -> List[Dict]:
+        """Rooms with no booking overlapping start..end (or covering start, if start == end)"""
+        return self.free_rooms_multi([(start, end)])
+
+    def free_rooms_multi(self, ranges: Sequence[TimeRange]) -> List[Dict]:
+        """Rooms free during every one of the given ranges"""
+        free = np.flatnonzero(~self._busy_mask(ranges))
+        return [self.rooms[i] for i in free]
+
+    def free_for(self, start: time, minutes: int) -> List[Dict]:
+        """Rooms free from start for the next `minutes` (capped at end of day)"""
+        end_minutes = min(start.hour * 60 + start.minute + minutes, 24 * 60 - 1)
+        end = time(end_minutes // 60, end_minutes % 60)
+        return self.free_rooms(start, end)
+
+    def are_free(self, classroom_ids: Sequence[str], ranges: Sequence[TimeRange]) -> Dict[str, bool]:
+        """Free/busy answer for specific rooms; unknown ids are omitted"""
+        mask = self._busy_mask(ranges)
+        return {
+            cid: not bool(mask[self._room_pos[cid]])
+            for cid in classroom_ids if cid in self._room_pos
+        }
+
+    def __len__(self) -> int:
+        return len(self.rooms)
+
+
+room_occupancy = RoomOccupancyIndex()
+
+
+@register_loader
+async def load_room_occupancy():
+    """(Re)load room_occupancy from classroom_index + session"""
+    if not classroom_index.loaded:
+        raise RuntimeError("classroom index is not loaded")
+    bookings = await fetch_query_async(BOOKINGS_SQL)
+    room_occupancy.load(classroom_index.rooms, bookings)
+    logger.info("Room occupancy loaded (%d rooms, %d bookings)", len(classroom_index), len(bookings))
@@ -0,0 +1,197 @@
+# schedule.py - Owns the batch_schedule materialized view (migrations/0002)
+
+import asyncio
+import logging
+import os
+from bisect import bisect_right
+from datetime import datetime, time
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from db import get_connection, fetch_query_async
+from schema_context import DAY_TO_BINARY
+from query_router import get_current_day
+
+logger = logging.getLogger(__name__)
+
+SCHEDULE_CONFIG = {
+    "refresh_interval": float(os.getenv("SCHEDULE_REFRESH_SECONDS", "0")),  # 0 = only refresh on demand
+    "refresh_timeout": float(os.getenv("SCHEDULE_REFRESH_TIMEOUT_SECONDS", "300")),
+    "index_reload_interval": float(os.getenv("SCHEDULE_INDEX_RELOAD_SECONDS", "300")),  # 0 = only on refresh
+}
+
+REFRESH_SQL = "REFRESH MATERIALIZED VIEW CONCURRENTLY batch_schedule;"
+
+# Called after every successful refresh (e.g. to drop cached timetables)
+_refresh_listeners: List[Callable[[], Optional[Awaitable[None]]]] = []
+# Rebuild in-memory structures derived from batch_schedule (startup, refresh, periodic reload)
+_loaders: List[Callable[[], Awaitable[None]]] = []
+_background_tasks: List[asyncio.Task] = []
+
+
+def on_refresh(callback: Callable[[], Optional[Awaitable[None]]]):
+    """Register a callback (sync or async) to run after batch_schedule is refreshed"""
+    _refresh_listeners.append(callback)
+    return callback
+
+
+def register_loader(loader: Callable[[], Awaitable[None]]):
+    """Register an async loader that rebuilds an in-memory view of batch_schedule"""
+    _loaders.append(loader)
+    return loader
+
+
+async def run_loaders():
+    for loader in _loaders:
+        try:
+            await loader()
+        except Exception as e:
+            logger.error("%s failed: %s", loader.__name__, e)
+
+
+async def refresh_batch_schedule():
+    """
+    Rebuild batch_schedule from the lesson/card tables without blocking readers,
+    then notify listeners.
+    """
+    async with get_connection() as conn:
+        await conn.execute(REFRESH_SQL, timeout=SCHEDULE_CONFIG["refresh_timeout"])
+    logger.info("batch_schedule refreshed")
+
+    for callback in _refresh_listeners:
+        result = callback()
+        if asyncio.iscoroutine(result):
+            await result
+    await run_loaders()
+
+
+# ============================================================================
+# IN-MEMORY "WHERE IS BATCH NOW" INDEX
+# ============================================================================
+
+SCHEDULE_INDEX_SQL = """
+SELECT
+    batch_name,
+    subject AS subject_name,
+    lesson_type,
+    period,
+    day_code AS day_binary,
+    classroom AS classroom_name,
+    start_time,
+    end_time
+FROM batch_schedule
+ORDER BY batch_name, day_code, start_time;
+"""
+
+
+def _seconds(t: time) -> int:
+    return t.hour * 3600 + t.minute * 60 + t.second
+
+
+class BatchScheduleIndex:
+    """
+    Weekly schedule held per (batch_name, day_code) as slots sorted by start
+    time, so "what is this batch doing now" is a bisect instead of a query.
+    """
+
+    def __init__(self):
+        # (batch, day_code) -> (start seconds, end seconds, rows, longest slot in seconds)
+        self._slots: Dict[Tuple[str, str], tuple] = {}
+        self.loaded_at: Optional[datetime] = None
+
+    @property
+    def loaded(self) -> bool:
+        return self.loaded_at is not None
+
+    def load(self, rows: List[dict]):
+        """Rebuild from batch_schedule rows and swap in atomically"""
+        grouped: Dict[Tuple[str, str], list] = {}
+        for row in rows:
+            if row.get('start_time') is None or row.get('end_time') is None:
+                continue
+            grouped.setdefault((row['batch_name'], row['day_binary']), []).append(row)
+
+        slots = {}
+        for key, entries in grouped.items():
+            entries.sort(key=lambda r: r['start_time'])
+            starts = [_seconds(r['start_time']) for r in entries]
+            ends = [_seconds(r['end_time']) for r in entries]
+            longest = max(e - s for s, e in zip(starts, ends))
+            slots[key] = (starts, ends, entries, longest)
+
+        self._slots = slots
+        self.loaded_at = datetime.now()
+
+    def current(self, batch_name: str, day_code: Optional[str], at: time) -> List[dict]:
+        """Rows whose slot contains `at` (inclusive, like BETWEEN), earliest start first"""
+        if not day_code:
+            return []
+        slot = self._slots.get((batch_name, day_code))
+        if not slot:
+            return []
+
+        starts, ends, entries, longest = slot
+        now = _seconds(at)
+        matches = []
+        i = bisect_right(starts, now) - 1
+        # Only slots starting within `longest` seconds before now can still be running
+        while i >= 0 and starts[i] >= now - longest:
+            if ends[i] >= now:
+                matches.append(entries[i])
+            i -= 1
+        matches.reverse()
+        return matches
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+
+schedule_index = BatchScheduleIndex()
+
+
+def current_day_code() -> Optional[str]:
+    """Today's binary day code, or None on Sunday"""
+    return DAY_TO_BINARY.get(get_current_day())
+
+
+@register_loader
+async def load_schedule_index():
+    """(Re)load schedule_index from batch_schedule"""
+    rows = await fetch_query_async(SCHEDULE_INDEX_SQL)
+    schedule_index.load(rows)
+    logger.info("Schedule index loaded (%d batch-days, %d slots)", len(schedule_index), len(rows))
+
+
+# ============================================================================
+# BACKGROUND JOBS
+# ============================================================================
+
+async def _refresh_loop(interval: float):
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await refresh_batch_schedule()
+        except Exception as e:
+            logger.error("batch_schedule refresh failed: %s", e)
+
+
+async def _reload_loop(interval: float):
+    # Picks up refreshes made by other workers
+    while True:
+        await asyncio.sleep(interval)
+        await run_loaders()
+
+
+async def start_background_jobs():
+    """Run the loaders once and start the periodic refresh/reload jobs"""
+    await run_loaders()
+
+    if SCHEDULE_CONFIG["refresh_interval"] > 0:
+        _background_tasks.append(asyncio.create_task(_refresh_loop(SCHEDULE_CONFIG["refresh_interval"])))
+    if SCHEDULE_CONFIG["index_reload_interval"] > 0:
+        _background_tasks.append(asyncio.create_task(_reload_loop(SCHEDULE_CONFIG["index_reload_interval"])))
+
+
+def stop_background_jobs():
+    for task in _background_tasks:
+        task.cancel()
+    _background_tasks.clear()
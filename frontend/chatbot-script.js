@@ -195,16 +195,36 @@ document.addEventListener('DOMContentLoaded', () => {
         const thinkingMessage = chatBody.lastElementChild;
 
         try {
-            const response = await fetch('http://localhost:8000/chat', {
+            const response = await fetch('http://localhost:8000/chat/stream', {
                 method: 'POST',
                 headers: { 'Content-Type': 'application/json' },
                 body: JSON.stringify({ message: message })
             });
 
-            const data = await response.json();
+            // An error status has no event stream to read
+            if (!response.ok) {
+                console.error('Error: /chat/stream returned', response.status);
+                thinkingMessage.remove();
+                addMessage(`Sorry, the server could not answer (error ${response.status}). Please try again.`, 'bot');
+                return;
+            }
 
-            thinkingMessage.remove();
-            addMessage(data.reply, 'bot');   // << FIXED
+            // Replace "Thinking..." with the first chunk, then keep appending
+            const botMessage = thinkingMessage.querySelector('.bot-message');
+            let received = false;
+            await readChatStream(response, (text) => {
+                if (!received) {
+                    botMessage.textContent = '';
+                    received = true;
+                }
+                botMessage.textContent += text;
+                chatBody.scrollTop = chatBody.scrollHeight;
+            });
+
+            if (!received) {
+                thinkingMessage.remove();
+                addMessage('Sorry, I did not get a reply. Please try again.', 'bot');
+            }
 
         } catch (error) {
             console.error('Error:', error);
@@ -214,6 +234,45 @@ document.addEventListener('DOMContentLoaded', () => {
     }
 });
 
+    // Reads the Server-Sent Events from /chat/stream and calls onText for
+    // every "chunk" event until the "done" event arrives
+    async function readChatStream(response, onText) {
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) {
+                break;
+            }
+            buffer += decoder.decode(value, { stream: true });
+
+            let boundary;
+            while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+                const block = buffer.slice(0, boundary);
+                buffer = buffer.slice(boundary + 2);
+
+                let event = 'message';
+                let data = '';
+                for (const line of block.split('\n')) {
+                    if (line.startsWith('event: ')) {
+                        event = line.slice(7);
+                    } else if (line.startsWith('data: ')) {
+                        data += line.slice(6);
+                    }
+                }
+
+                if (event === 'done') {
+                    return;
+                }
+                if (event === 'chunk' && data) {
+                    onText(JSON.parse(data).text);
+                }
+            }
+        }
+    }
+
 
     // Other event listeners (for new chat, logout, etc.) remain the same
     userInput.addEventListener('input', () => {